@@ -0,0 +1,507 @@
+"""
+Throughput and latency benchmarks against a seeded scratch database.
+
+Reuses the query guard's scratch database, bulk seeder and in-process ASGI
+driver, so runs need no server or network and are comparable with each
+other. Every benchmark prints requests/s, p50/p95 latency and the process
+CPU time spent per request.
+
+    python -m app.bench auth --units 50000 --requests 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import json
+import statistics
+import sys
+import time
+from typing import Callable
+
+from .query_guard import GUARD_MOBILE, GUARD_PASSWORD, asgi_request, seed_large_dataset, use_scratch_database
+
+API = "/api/v1"
+
+
+@dataclass
+class Measurement:
+    label: str
+    requests: int
+    wall_seconds: float
+    cpu_seconds: float
+    latencies: list[float] = field(repr=False)
+    response_bytes: int = 0
+
+    @property
+    def per_second(self) -> float:
+        return self.requests / self.wall_seconds if self.wall_seconds else 0.0
+
+    def percentile_ms(self, pct: int) -> float:
+        if len(self.latencies) < 2:
+            return (self.latencies[0] if self.latencies else 0.0) * 1000
+        return statistics.quantiles(self.latencies, n=100)[pct - 1] * 1000
+
+    def as_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "requests": self.requests,
+            "per_second": round(self.per_second, 1),
+            "p50_ms": round(self.percentile_ms(50), 2),
+            "p95_ms": round(self.percentile_ms(95), 2),
+            "cpu_ms_per_request": round(self.cpu_seconds / self.requests * 1000, 3) if self.requests else 0.0,
+            "response_bytes": self.response_bytes,
+        }
+
+
+def drive(
+    app,
+    label: str,
+    method: str,
+    path: str,
+    token: str | None,
+    total: int,
+    concurrency: int,
+    query: dict | None = None,
+    body: dict | None = None,
+    headers: dict[str, str] | None = None,
+    warmup: int = 20,
+) -> Measurement:
+    """Sends ``total`` identical requests from ``concurrency`` workers and times each one."""
+    response_bytes = 0
+
+    async def worker(count: int, latencies: list[float]) -> None:
+        nonlocal response_bytes
+        for _ in range(count):
+            started = time.perf_counter()
+            status, content = await asgi_request(app, method, path, query, body, token, headers)
+            if status >= 400:
+                raise RuntimeError(f"{label}: HTTP {status} {content[:200]!r}")
+            latencies.append(time.perf_counter() - started)
+            response_bytes = len(content)
+
+    async def run() -> Measurement:
+        await worker(warmup, [])
+        latencies: list[float] = []
+        shares = [total // concurrency + (index < total % concurrency) for index in range(concurrency)]
+        cpu_started, wall_started = time.process_time(), time.perf_counter()
+        await asyncio.gather(*(worker(share, latencies) for share in shares))
+        wall, cpu = time.perf_counter() - wall_started, time.process_time() - cpu_started
+        return Measurement(label, total, wall, cpu, latencies, response_bytes)
+
+    return asyncio.run(run())
+
+
+def time_calls(label: str, call: Callable[[], object], repeat: int) -> Measurement:
+    """Times ``repeat`` sequential in-process calls, for work that is not an HTTP request."""
+    latencies = []
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    wall, cpu = time.perf_counter() - wall_started, time.process_time() - cpu_started
+    return Measurement(label, repeat, wall, cpu, latencies)
+
+
+def login(app) -> str:
+    credentials = {"mobile": GUARD_MOBILE, "password": GUARD_PASSWORD}
+    status, body = asyncio.run(asgi_request(app, "POST", f"{API}/auth/login", None, credentials, None))
+    if status != 200:
+        raise RuntimeError(f"login failed: HTTP {status} {body[:200]!r}")
+    return json.loads(body)["access_token"]
+
+
+def seed(unit_count: int, archive: bool = True) -> dict:
+    from .db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return seed_large_dataset(db, unit_count, archive=archive)
+    finally:
+        db.close()
+
+
+def print_measurements(measurements: list[Measurement]) -> None:
+    width = max(len(item.label) for item in measurements)
+    print(f"{'':<{width}}  {'req/s':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'cpu ms/req':>10}  {'bytes':>9}")
+    for item in measurements:
+        row = item.as_dict()
+        print(
+            f"{item.label:<{width}}  {row['per_second']:>8.1f}  {row['p50_ms']:>8.2f}  "
+            f"{row['p95_ms']:>8.2f}  {row['cpu_ms_per_request']:>10.3f}  {row['response_bytes'] or '-':>9}"
+        )
+
+
+def bench_auth(args: argparse.Namespace) -> list[Measurement]:
+    """
+    Authenticated endpoints under three revocation strategies: no check at
+    all (the cost floor), the Bloom filter in front of the revoked-token
+    table (what ships), and a revoked-token lookup on every request.
+    """
+    from unittest import mock
+
+    from sqlalchemy import insert
+
+    from . import deps
+    from .core.revocation import revocation_filter
+    from .db import SessionLocal
+    from .main import app
+    from .models import RevokedToken, now_utc
+
+    ctx = seed(args.units)
+    db = SessionLocal()
+    try:
+        expires_at = now_utc() + timedelta(days=1)
+        db.execute(
+            insert(RevokedToken),
+            [{"jti": f"bench-{index}", "expires_at": expires_at} for index in range(args.revoked)],
+        )
+        db.commit()
+        revocation_filter.sync(db)
+    finally:
+        db.close()
+    token = login(app)
+
+    modes: dict[str, list[Callable]] = {
+        "no check": [
+            lambda: mock.patch.object(deps, "is_access_token_revoked", lambda db, jti: False),
+            lambda: mock.patch.object(revocation_filter, "maybe_sync", lambda db: None),
+        ],
+        "bloom": [],
+        "db lookup": [lambda: mock.patch.object(revocation_filter, "might_be_revoked", lambda jti: True)],
+    }
+    endpoints = [
+        ("me", f"{API}/auth/me"),
+        ("my requests", f"{API}/requests/my"),
+        ("analytics", f"{API}/analytics/projects/{ctx['project_id']}/summary"),
+    ]
+    measurements = []
+    for name, path in endpoints:
+        for mode, patches in modes.items():
+            with ExitStack() as stack:
+                for make_patch in patches:
+                    stack.enter_context(make_patch())
+                measurements.append(
+                    drive(app, f"{name} [{mode}]", "GET", path, token, args.requests, args.concurrency)
+                )
+    return measurements
+
+
+def bench_archive(args: argparse.Namespace) -> list[Measurement]:
+    """
+    Hot-path latency over the purchase request and payment tables before
+    and after archiving the finished rows the seeder leaves in them.
+    """
+    from sqlalchemy import func, text
+
+    from .db import SessionLocal
+    from .main import app
+    from .models import Payment, PurchaseRequest, Unit, User
+    from .services.archive import archive_finished_rows
+
+    seed(args.units, archive=False)
+    db = SessionLocal()
+    try:
+        guard_user_id = db.query(User.id).filter(User.mobile == GUARD_MOBILE).scalar()
+        owned_unit_id = (
+            db.query(PurchaseRequest.unit_id)
+            .join(Unit, Unit.id == PurchaseRequest.unit_id)
+            .filter(
+                PurchaseRequest.user_id == guard_user_id,
+                PurchaseRequest.status == "submitted",
+                Unit.status != "sold",
+            )
+            .limit(1)
+            .scalar()
+        )
+        # Re-initiating a request that already has an initiated payment returns
+        # it via the request_id + status lookup without writing anything.
+        pending_request_id = (
+            db.query(Payment.request_id)
+            .join(PurchaseRequest, PurchaseRequest.id == Payment.request_id)
+            .filter(PurchaseRequest.user_id == guard_user_id, Payment.status == "initiated")
+            .limit(1)
+            .scalar()
+        )
+        # A callback for a payment that already succeeded only reads; recent ones stay hot.
+        hot_authority = (
+            db.query(Payment.authority)
+            .filter(Payment.status == "success")
+            .order_by(Payment.id.desc())
+            .limit(1)
+            .scalar()
+        )
+    finally:
+        db.close()
+    token = login(app)
+    initiate_body = {"request_id": pending_request_id}
+    callback_query = {"authority": hot_authority, "status": "OK"}
+    endpoints = [
+        ("my requests", "GET", f"{API}/requests/my", None, None),
+        ("create request (existing)", "POST", f"{API}/requests", None, {"unit_id": owned_unit_id}),
+        ("initiate payment (existing)", "POST", f"{API}/payments/initiate", None, initiate_body),
+        ("payment callback", "GET", f"{API}/payments/callback", callback_query, None),
+    ]
+
+    def measure(phase: str) -> list[Measurement]:
+        # Single runs swing by a third between identical phases, so each
+        # endpoint is run over interleaved rounds and the median round kept.
+        rounds: list[list[Measurement]] = [[] for _ in endpoints]
+        for _ in range(args.rounds):
+            for runs, (name, method, path, query, body) in zip(rounds, endpoints):
+                runs.append(
+                    drive(
+                        app,
+                        f"{name} [{phase}]",
+                        method,
+                        path,
+                        token,
+                        args.requests,
+                        args.concurrency,
+                        query=query,
+                        body=body,
+                    )
+                )
+        return [sorted(runs, key=lambda item: item.per_second)[len(runs) // 2] for runs in rounds]
+
+    def hot_rows() -> tuple[int, int]:
+        db = SessionLocal()
+        try:
+            requests = db.query(func.count(PurchaseRequest.id)).scalar()
+            return requests, db.query(func.count(Payment.id)).scalar()
+        finally:
+            db.close()
+
+    before = measure("before")
+    rows_before = hot_rows()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        requests_moved, payments_moved = archive_finished_rows(db, timedelta(days=365))
+        elapsed = time.perf_counter() - started
+        # The seeded state was analyzed; refresh planner statistics for the smaller tables too.
+        db.execute(text("ANALYZE"))
+        db.commit()
+    finally:
+        db.close()
+    rows_after = hot_rows()
+    print(
+        f"archived {requests_moved} requests and {payments_moved} payments in {elapsed:.2f}s; "
+        f"hot rows {rows_before[0]}/{rows_before[1]} -> {rows_after[0]}/{rows_after[1]} (requests/payments)"
+    )
+    after = measure("after")
+    return [item for pair in zip(before, after) for item in pair]
+
+
+def bench_rollups(args: argparse.Namespace) -> list[Measurement]:
+    """
+    Analytics reads served from the rollup tables against recomputing the
+    same numbers from the base tables, plus what the rollups cost: the
+    upserts every status transition pays, and a full rebuild and verify.
+    """
+    from .db import SessionLocal
+    from .main import app
+    from .services.analytics import (
+        apply_transition,
+        rebuild_rollups,
+        recompute_counters,
+        recompute_daily,
+        verify_rollups,
+    )
+
+    ctx = seed(args.units)
+    token = login(app)
+    project_id = ctx["project_id"]
+    today = datetime.now(timezone.utc).date()
+    daily_query = {"date_from": (today - timedelta(days=90)).isoformat(), "date_to": today.isoformat()}
+    base = f"{API}/analytics/projects/{project_id}"
+    measurements = [
+        drive(app, "summary [rollups]", "GET", f"{base}/summary", token, args.requests, args.concurrency),
+        drive(
+            app,
+            "daily 90d [rollups]",
+            "GET",
+            f"{base}/daily",
+            token,
+            args.requests,
+            args.concurrency,
+            query=daily_query,
+        ),
+    ]
+
+    db = SessionLocal()
+    try:
+        repeat = max(1, args.requests // 200)
+        measurements.append(time_calls("counters [recomputed]", lambda: recompute_counters(db), repeat))
+        measurements.append(time_calls("daily [recomputed]", lambda: recompute_daily(db), repeat))
+
+        def transition() -> None:
+            apply_transition(db, project_id, "purchase_request", "submitted", "draft", None, today)
+
+        measurements.append(time_calls("transition upserts", transition, args.requests))
+        db.rollback()
+        measurements.append(time_calls("rebuild_rollups", lambda: rebuild_rollups(db), 1))
+        db.commit()
+        measurements.append(time_calls("verify_rollups", lambda: verify_rollups(db), 1))
+    finally:
+        db.close()
+    return measurements
+
+
+def bench_pricing(args: argparse.Namespace) -> list[Measurement]:
+    """
+    Repricing preview and apply over one project holding all ``--units``
+    units, through the HTTP endpoints. Each apply alternates the price per
+    m2 so that every matched unit's price really changes and is written.
+    """
+    from sqlalchemy import insert, text
+
+    from .db import SessionLocal
+    from .main import app
+    from .models import Project, Unit
+
+    seed(1000)
+    db = SessionLocal()
+    try:
+        project = Project(title="برج قیمت‌گذاری", slug="bench-repricing", status="pre_sale")
+        db.add(project)
+        db.flush()
+        statuses = ["available"] * 7 + ["reserved"] * 2 + ["sold"]
+        for start in range(0, args.units, 50000):
+            db.execute(
+                insert(Unit),
+                [
+                    {
+                        "project_id": project.id,
+                        "unit_code": f"R-{index}",
+                        "floor": index % 40 + 1,
+                        "area_m2": 60 + index % 140,
+                        "bedrooms": index % 4 + 1,
+                        "price": 9_000_000_000 + index % 1000 * 1_000_000,
+                        "status": statuses[index % len(statuses)],
+                    }
+                    for index in range(start, min(start + 50000, args.units))
+                ],
+            )
+        db.commit()
+        db.execute(text("ANALYZE"))
+        db.commit()
+        project_id = project.id
+    finally:
+        db.close()
+    token = login(app)
+    base = f"{API}/projects/{project_id}/repricing"
+    all_statuses = ["available", "reserved", "sold"]
+    rules = {"statuses": all_statuses, "price_per_m2": 150_000_000, "floor_premium_pct": 1.5}
+    per_m2 = iter(range(150_000_000, 10**12, 1_000_000))
+
+    def call(path: str, body: dict) -> None:
+        status, content = asyncio.run(asgi_request(app, "POST", path, None, body, token))
+        if status >= 400:
+            raise RuntimeError(f"{path}: HTTP {status} {content[:200]!r}")
+
+    def apply() -> None:
+        call(f"{base}/apply", {"rules": {**rules, "price_per_m2": next(per_m2)}})
+
+    return [
+        time_calls("preview", lambda: call(f"{base}/preview", rules), args.rounds),
+        time_calls("apply", apply, args.rounds),
+    ]
+
+
+@contextmanager
+def without_middleware(app, middleware_class: type):
+    """Rebuilds the app's middleware stack without ``middleware_class`` for the duration."""
+    saved = app.user_middleware
+    app.user_middleware = [item for item in saved if item.cls is not middleware_class]
+    app.middleware_stack = None
+    try:
+        yield
+    finally:
+        app.user_middleware = saved
+        app.middleware_stack = None
+
+
+def bench_compression(args: argparse.Namespace) -> list[Measurement]:
+    """
+    Server CPU per request with the compression middleware removed, with it
+    but no Accept-Encoding (ETag hashing only), and with gzip or brotli.
+    The public unit list is served from the compressed-body cache after the
+    first request; the per-user request list is compressed every time.
+    """
+    from .main import app
+    from .middleware import CompressionMiddleware
+
+    ctx = seed(args.units)
+    token = login(app)
+    endpoints = [
+        ("units", f"{API}/projects/{ctx['project_id']}/units", None),
+        ("my requests", f"{API}/requests/my", token),
+    ]
+    modes = [
+        ("none", None),
+        ("identity", {}),
+        ("gzip", {"accept-encoding": "gzip"}),
+        ("br", {"accept-encoding": "br"}),
+    ]
+    measurements = []
+    for name, path, auth in endpoints:
+        for mode, headers in modes:
+            label = f"{name} [{mode}]"
+            if headers is None:
+                with without_middleware(app, CompressionMiddleware):
+                    measurements.append(drive(app, label, "GET", path, auth, args.requests, args.concurrency))
+            else:
+                measurements.append(
+                    drive(app, label, "GET", path, auth, args.requests, args.concurrency, headers=headers)
+                )
+    return measurements
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.bench")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    auth = commands.add_parser("auth", help="authenticated throughput with and without revocation checks")
+    auth.add_argument("--revoked", type=int, default=50000, help="extra unexpired revoked-token rows to seed")
+    auth.set_defaults(handler=bench_auth)
+
+    archive = commands.add_parser("archive", help="hot-path latency before and after archiving")
+    archive.add_argument("--rounds", type=int, default=3, help="runs per endpoint; median kept")
+    archive.set_defaults(handler=bench_archive)
+
+    rollups = commands.add_parser("rollups", help="analytics reads from rollups against live recomputation")
+    rollups.set_defaults(handler=bench_rollups)
+
+    pricing = commands.add_parser("pricing", help="repricing preview and apply over one large project")
+    pricing.add_argument("--rounds", type=int, default=3, help="timed calls of each endpoint")
+    pricing.set_defaults(handler=bench_pricing)
+
+    compression = commands.add_parser("compression", help="server CPU per request, compressed or not")
+    compression.set_defaults(handler=bench_compression)
+
+    for command in commands.choices.values():
+        command.add_argument("--units", type=int, default=20000, help="number of units to seed")
+        command.add_argument("--requests", type=int, default=1000, help="timed requests per measurement")
+        command.add_argument("--concurrency", type=int, default=8, help="concurrent in-process clients")
+        command.add_argument("--report", help="write the measurements as JSON")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    use_scratch_database()
+    measurements = args.handler(args)
+    print_measurements(measurements)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as handle:
+            json.dump([item.as_dict() for item in measurements], handle, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,15 +10,23 @@ class Settings(BaseSettings):
     app_name: str = "OnePay Residential API"
     api_prefix: str = "/api/v1"
     secret_key: str = "change-me"
-    access_token_expire_minutes: int = 120
+    access_token_expire_minutes: int = 15
+    refresh_token_expire_days: int = 30
+    revocation_sync_seconds: int = 30
+    compression_minimum_size: int = 1024
+    compression_cache_max_bytes: int = 32 * 1024 * 1024
+    archive_after_days: int = 365
+    draft_expire_days: int = 30
+    archive_batch_size: int = 1000
     database_url: str = "sqlite:///./onepay.db"
     backend_public_url: str = "http://localhost:8000"
     cors_origins: list[str] = ["http://localhost:3000"]
+    staff_mobiles: list[str] = []
 
     autodesk_client_id: str | None = None
     autodesk_client_secret: str | None = None
 
-    @field_validator("cors_origins", mode="before")
+    @field_validator("cors_origins", "staff_mobiles", mode="before")
     @classmethod
     def parse_origins(cls, value: object) -> object:
         if isinstance(value, str):
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import hashlib
+import math
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from ..models import RevokedToken
+from .config import settings
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing of one BLAKE2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationFilter:
+    """
+    In-process view of ``revoked_tokens``. Requests only consult the Bloom
+    filter; the table is re-read at most every ``revocation_sync_seconds``
+    (by whichever request notices the filter is stale), and a positive hit
+    is confirmed against the database to rule out false positives.
+    """
+
+    def __init__(self, sync_seconds: int):
+        self.sync_seconds = sync_seconds
+        self._filter = BloomFilter(1024)
+        self._synced_at: float | None = None
+        self._lock = threading.Lock()
+        # jti -> expiry of tokens revoked by this process that a table read
+        # has not yet shown committed; guarded by _local_lock, which is only
+        # held briefly so logouts never wait on a sync's table read.
+        self._local: dict[str, datetime] = {}
+        self._local_lock = threading.Lock()
+
+    def sync(self, db: Session) -> None:
+        now = datetime.now(timezone.utc)
+        jtis = {row[0] for row in db.query(RevokedToken.jti).filter(RevokedToken.expires_at > now)}
+        fresh = BloomFilter(max(1024, len(jtis) * 2))
+        for jti in jtis:
+            fresh.add(jti)
+        with self._local_lock:
+            # A revocation added while the table was being read (or not yet
+            # committed) is missing from ``jtis``; carry it over until a read sees it.
+            self._local = {
+                jti: expires_at
+                for jti, expires_at in self._local.items()
+                if jti not in jtis and expires_at > now
+            }
+            for jti in self._local:
+                fresh.add(jti)
+            self._filter = fresh
+        self._synced_at = time.monotonic()
+
+    def maybe_sync(self, db: Session) -> None:
+        if self._synced_at is not None and time.monotonic() - self._synced_at < self.sync_seconds:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self.sync(db)
+        finally:
+            self._lock.release()
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        with self._local_lock:
+            self._local[jti] = expires_at
+            self._filter.add(jti)
+
+    def might_be_revoked(self, jti: str) -> bool:
+        return jti in self._filter
+
+
+revocation_filter = RevocationFilter(settings.revocation_sync_seconds)
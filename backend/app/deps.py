@@ -5,11 +5,15 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from .core.config import settings
+from .core.revocation import revocation_filter
 from .core.security import decode_access_token
 from .db import SessionLocal
-from .models import User
+from .models import Project, User
+from .services.tokens import is_access_token_revoked
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.api_prefix}/auth/login")
+# For endpoints that also accept other proof of identity (logout takes the refresh token).
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.api_prefix}/auth/login", auto_error=False)
 
 
 def get_db():
@@ -31,7 +35,23 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except Exception as exc:  # noqa: BLE001
         raise credentials_error from exc
 
+    jti = payload.get("jti")
+    revocation_filter.maybe_sync(db)
+    if jti and is_access_token_revoked(db, jti):
+        raise credentials_error
+
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise credentials_error
     return user
+
+
+def get_staff_user(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.mobile not in settings.staff_mobiles:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Staff access required")
+    return current_user
+
+
+def ensure_project(db: Session, project_id: int) -> None:
+    if not db.query(Project.id).filter(Project.id == project_id).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
@@ -5,9 +5,14 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from .core.config import settings
 from .db import Base, engine
-from .routers import auth, payments, projects, requests
+from .middleware import CompressionMiddleware
+from .routers import analytics, auth, events, payments, pricing, projects, requests
+from .services.analytics import ensure_rollups
+from .services.search import ensure_search_index
 
 Base.metadata.create_all(bind=engine)
+ensure_search_index(engine)
+ensure_rollups(engine)
 
 app = FastAPI(title=settings.app_name)
 
@@ -18,11 +23,19 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    cache_max_bytes=settings.compression_cache_max_bytes,
+)
 
 app.include_router(auth.router, prefix=settings.api_prefix)
 app.include_router(projects.router, prefix=settings.api_prefix)
 app.include_router(requests.router, prefix=settings.api_prefix)
 app.include_router(payments.router, prefix=settings.api_prefix)
+app.include_router(events.router, prefix=settings.api_prefix)
+app.include_router(analytics.router, prefix=settings.api_prefix)
+app.include_router(pricing.router, prefix=settings.api_prefix)
 
 
 @app.get("/health")
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+from datetime import date, timedelta
+import sys
+
+from .core.config import settings
+from .db import Base, SessionLocal, engine
+from .services.analytics import ensure_rollups, rebuild_rollups, verify_rollups
+from .services.archive import archive_finished_rows, expire_stale_drafts
+from .services.search import ensure_search_index, reindex_projects
+from .services.tokens import purge_expired_tokens
+
+
+def cmd_rebuild_rollups(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db, since=args.since)
+        db.commit()
+    finally:
+        db.close()
+    print("Rollups rebuilt.")
+    return 0
+
+
+def cmd_verify_rollups(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        mismatches = verify_rollups(db)
+    finally:
+        db.close()
+    for line in mismatches:
+        print(line)
+    print(f"{len(mismatches)} mismatches.")
+    return 1 if mismatches else 0
+
+
+def cmd_reindex_search(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        count = reindex_projects(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Indexed {count} projects.")
+    return 0
+
+
+def cmd_purge_tokens(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        removed = purge_expired_tokens(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Removed {removed} expired token rows.")
+    return 0
+
+
+def cmd_archive(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        expired = expire_stale_drafts(db, timedelta(days=args.expire_drafts_after_days), args.batch_size)
+        requests_moved, payments_moved = archive_finished_rows(
+            db, timedelta(days=args.older_than_days), args.batch_size
+        )
+    finally:
+        db.close()
+    print(f"Cancelled {expired} stale drafts.")
+    print(f"Archived {requests_moved} requests and {payments_moved} payments.")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.manage")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-rollups", help="recompute analytics rollups")
+    rebuild.add_argument(
+        "--since", type=date.fromisoformat, default=None, help="only replay days from YYYY-MM-DD"
+    )
+    rebuild.set_defaults(handler=cmd_rebuild_rollups)
+
+    verify = commands.add_parser("verify-rollups", help="compare rollups with a full recomputation")
+    verify.set_defaults(handler=cmd_verify_rollups)
+
+    reindex = commands.add_parser("reindex-search", help="rebuild the project full-text index")
+    reindex.set_defaults(handler=cmd_reindex_search)
+
+    purge = commands.add_parser("purge-tokens", help="delete expired refresh and revoked-token rows")
+    purge.set_defaults(handler=cmd_purge_tokens)
+
+    archive = commands.add_parser("archive", help="expire stale drafts and archive finished rows")
+    archive.add_argument("--older-than-days", type=int, default=settings.archive_after_days)
+    archive.add_argument("--expire-drafts-after-days", type=int, default=settings.draft_expire_days)
+    archive.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    archive.set_defaults(handler=cmd_archive)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    Base.metadata.create_all(bind=engine)
+    if ensure_search_index(engine, backfill=args.command != "reindex-search"):
+        print("Search index was empty and has been built.")
+    if args.command != "rebuild-rollups" and ensure_rollups(engine):
+        print("Analytics rollups were empty and have been built.")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
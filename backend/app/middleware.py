@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import gzip
+import hashlib
+
+import brotli
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml")
+ENCODING_SUFFIXES = {"br": "br", "gzip": "gz"}
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (body hash, encoding), bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+
+    def get(self, key: tuple[str, str]) -> bytes | None:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key: tuple[str, str], value: bytes) -> None:
+        if len(value) > self.max_bytes or key in self._items:
+            return
+        self._items[key] = value
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self.size -= len(evicted)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Picks br or gzip from an Accept-Encoding header, honouring q-values; br wins ties."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name] = quality
+    wildcard = weights.get("*", 0.0)
+    candidates = [(weights.get(name, wildcard), name) for name in ("br", "gzip")]
+    quality, name = max(candidates, key=lambda item: (item[0], item[1] == "br"))
+    return name if quality > 0 else None
+
+
+def etag_matches(if_none_match: str, body_hash: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        opaque = tag.strip().removeprefix("W/").strip('"')
+        if opaque.split("-", 1)[0] == body_hash:
+            return True
+    return False
+
+
+class CompressionMiddleware:
+    """
+    Adds strong ETags to buffered GET responses, answers matching
+    If-None-Match requests with 304 and compresses with brotli or gzip.
+    Streaming responses (no Content-Length) and already encoded bodies pass
+    through untouched. Compressed bodies of responses that are not per-user
+    are kept in an LRU so identical payloads are compressed only once.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        max_body_size: int = 8 * 1024 * 1024,
+        cache_max_bytes: int = 32 * 1024 * 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.max_body_size = max_body_size
+        self.cache = CompressedBodyCache(cache_max_bytes)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        start_message: Message | None = None
+        body_parts: list[bytes] = []
+        passthrough = False
+
+        async def buffered_send(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                if not self._is_eligible(message):
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+            if message["type"] == "http.response.body":
+                body_parts.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await self._send_final(start_message, b"".join(body_parts), request_headers, send)
+                return
+            await send(message)
+
+        await self.app(scope, receive, buffered_send)
+
+    def _is_eligible(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] != 200 or "content-encoding" in headers:
+            return False
+        content_length = headers.get("content-length")
+        return content_length is not None and int(content_length) <= self.max_body_size
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def _send_final(
+        self, start_message: Message, body: bytes, request_headers: Headers, send: Send
+    ) -> None:
+        headers = MutableHeaders(raw=list(start_message["headers"]))
+        body_hash = hashlib.blake2b(body, digest_size=16).hexdigest()
+        content_type = headers.get("content-type", "")
+        encoding = None
+        if len(body) >= self.minimum_size and content_type.startswith(COMPRESSIBLE_TYPES):
+            encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+            headers.add_vary_header("Accept-Encoding")
+        # Each encoding is a different representation, so it needs its own strong ETag.
+        etag = f'"{body_hash}-{ENCODING_SUFFIXES[encoding]}"' if encoding else f'"{body_hash}"'
+        headers["etag"] = etag
+
+        if etag_matches(request_headers.get("if-none-match", ""), body_hash):
+            for name in ("content-length", "content-type"):
+                del headers[name]
+            await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if encoding:
+            cacheable = "authorization" not in request_headers and not any(
+                directive in headers.get("cache-control", "") for directive in ("no-store", "private")
+            )
+            compressed = self.cache.get((body_hash, encoding)) if cacheable else None
+            if compressed is None:
+                # brotli/gzip hold the CPU for milliseconds on large bodies; keep that off the event loop.
+                compressed = await run_in_threadpool(self._compress, body, encoding)
+                if cacheable:
+                    self.cache.put((body_hash, encoding), compressed)
+            body = compressed
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(body))
+
+        await send({"type": "http.response.start", "status": 200, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
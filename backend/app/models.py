@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import BigInteger, Date, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .db import Base
@@ -58,6 +58,7 @@ class FloorPlan(Base):
 
 class Unit(Base):
     __tablename__ = "units"
+    __table_args__ = (Index("ix_units_project_status_price", "project_id", "status", "price"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), index=True)
@@ -65,7 +66,7 @@ class Unit(Base):
     floor: Mapped[int] = mapped_column(Integer)
     area_m2: Mapped[float] = mapped_column(Float)
     bedrooms: Mapped[int] = mapped_column(Integer, default=2)
-    price: Mapped[int] = mapped_column(Integer)
+    price: Mapped[int] = mapped_column(BigInteger)
     status: Mapped[str] = mapped_column(String(30), default="available")
 
     project: Mapped[Project] = relationship(back_populates="units")
@@ -74,6 +75,7 @@ class Unit(Base):
 
 class PurchaseRequest(Base):
     __tablename__ = "purchase_requests"
+    __table_args__ = (Index("ix_purchase_requests_unit_status", "unit_id", "status"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
@@ -91,6 +93,7 @@ class PurchaseRequest(Base):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (Index("ix_payments_request_status", "request_id", "status"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     request_id: Mapped[int] = mapped_column(ForeignKey("purchase_requests.id"), index=True)
@@ -103,3 +106,99 @@ class Payment(Base):
     verified_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     request: Mapped[PurchaseRequest] = relationship(back_populates="payments")
+
+
+class ArchivedPurchaseRequest(Base):
+    """Terminal purchase requests moved out of ``purchase_requests``; ids are preserved."""
+
+    __tablename__ = "purchase_requests_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    unit_id: Mapped[int] = mapped_column(ForeignKey("units.id"), index=True)
+    note: Mapped[str] = mapped_column(Text, default="")
+    status: Mapped[str] = mapped_column(String(30))
+    tracking_code: Mapped[str] = mapped_column(String(24), unique=True, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc)
+
+    unit: Mapped[Unit] = relationship(viewonly=True)
+
+
+class ArchivedPayment(Base):
+    """Terminal payments moved out of ``payments``; ids are preserved."""
+
+    __tablename__ = "payments_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    request_id: Mapped[int] = mapped_column(Integer, index=True)
+    amount: Mapped[int] = mapped_column(BigInteger)
+    gateway: Mapped[str] = mapped_column(String(40))
+    authority: Mapped[str] = mapped_column(String(80), unique=True, index=True)
+    status: Mapped[str] = mapped_column(String(20))
+    ref_id: Mapped[str | None] = mapped_column(String(80), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    verified_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc)
+
+
+class RefreshToken(Base):
+    """One row per issued refresh token; only the SHA-256 of the token is stored."""
+
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    family_id: Mapped[str] = mapped_column(String(32), index=True)
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class RevokedToken(Base):
+    """Access-token ids revoked before their natural expiry."""
+
+    __tablename__ = "revoked_tokens"
+
+    jti: Mapped[str] = mapped_column(String(32), primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+
+class StatusEvent(Base):
+    """Append-only log of status transitions; rows are never updated or deleted."""
+
+    __tablename__ = "status_events"
+    __table_args__ = (Index("ix_status_events_month_id", "month_bucket", "id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    month_bucket: Mapped[int] = mapped_column(Integer)
+    entity_type: Mapped[str] = mapped_column(String(30))
+    entity_id: Mapped[int] = mapped_column(Integer)
+    project_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    from_status: Mapped[str | None] = mapped_column(String(30), nullable=True)
+    to_status: Mapped[str] = mapped_column(String(30))
+    amount: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    actor_user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=now_utc)
+
+
+class ProjectCounter(Base):
+    """Running per-project totals such as ``unit.available`` or ``deposits_collected``."""
+
+    __tablename__ = "project_counters"
+
+    project_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(60), primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+class ProjectDailyCounter(Base):
+    """Per-project, per-day transition counts and collected amounts."""
+
+    __tablename__ = "project_daily_counters"
+
+    project_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    name: Mapped[str] = mapped_column(String(60), primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, default=0)
@@ -0,0 +1,564 @@
+"""
+Query-plan regression guard.
+
+Seeds a throwaway SQLite database with a realistic volume of data, drives
+every API endpoint through the ASGI app, captures each SQL statement it
+emits and runs ``EXPLAIN QUERY PLAN`` on it. The run fails when a plan
+contains a full table scan that the scenario does not explicitly allow, or
+when an endpoint issues more queries than its budget (or than a recorded
+baseline), which is how N+1 patterns show up against a large dataset.
+
+    python -m app.query_guard --units 50000 --report plan-report.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+from typing import Any, Callable
+from urllib.parse import urlencode
+
+GUARD_MOBILE = "09990000000"
+GUARD_PASSWORD = "QueryGuard123!"
+EXPLAINED_PREFIXES = ("SELECT", "WITH", "UPDATE", "DELETE")
+SQLITE_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)(\S+)")
+
+Value = Any | Callable[[dict], Any]
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: Value
+    max_queries: int
+    query: Value = None
+    body: Value = None
+    auth: bool = False
+    capture: str | None = None
+    allowed_scans: set[str] = field(default_factory=set)
+
+
+@dataclass
+class Capture:
+    statements: list[tuple[str, Any]] = field(default_factory=list)
+    active: bool = False
+
+
+@dataclass
+class ScenarioReport:
+    name: str
+    status: int
+    queries: int
+    max_queries: int
+    scans: list[str] = field(default_factory=list)
+    notes: list[str] = field(default_factory=list)
+    failures: list[str] = field(default_factory=list)
+
+
+def _resolve(value: Value, ctx: dict) -> Any:
+    return value(ctx) if callable(value) else value
+
+
+def build_scenarios() -> list[Scenario]:
+    repricing_rules = {"floor_premium_pct": 0.5, "market_index": 1.01}
+    return [
+        Scenario("list projects", "GET", "/projects", 1, allowed_scans={"projects"}),
+        Scenario("get project", "GET", lambda ctx: f"/projects/{ctx['project_id']}", 1),
+        Scenario("list units", "GET", lambda ctx: f"/projects/{ctx['project_id']}/units", 1),
+        Scenario(
+            "list available units",
+            "GET",
+            lambda ctx: f"/projects/{ctx['project_id']}/units",
+            1,
+            query={"status": "available"},
+        ),
+        Scenario("search projects", "GET", "/projects/search", 5, query={"q": "برج نگين"}),
+        Scenario(
+            "register",
+            "POST",
+            "/auth/register",
+            5,
+            body={"full_name": "New Buyer", "mobile": "09980000000", "password": GUARD_PASSWORD},
+        ),
+        Scenario(
+            "login",
+            "POST",
+            "/auth/login",
+            3,
+            body={"mobile": GUARD_MOBILE, "password": GUARD_PASSWORD},
+            capture="login",
+        ),
+        Scenario("me", "GET", "/auth/me", 1, auth=True),
+        Scenario(
+            "refresh",
+            "POST",
+            "/auth/refresh",
+            5,
+            body=lambda ctx: {"refresh_token": ctx["login"]["refresh_token"]},
+            capture="refreshed",
+        ),
+        Scenario(
+            "create request",
+            "POST",
+            "/requests",
+            10,
+            body=lambda ctx: {"unit_id": ctx["free_unit_id"]},
+            auth=True,
+            capture="request",
+        ),
+        Scenario("my requests", "GET", "/requests/my", 3, auth=True),
+        Scenario(
+            "submit request",
+            "POST",
+            lambda ctx: f"/requests/{ctx['request']['id']}/submit",
+            8,
+            auth=True,
+        ),
+        Scenario(
+            "initiate payment",
+            "POST",
+            "/payments/initiate",
+            14,
+            body=lambda ctx: {"request_id": ctx["request"]["id"]},
+            auth=True,
+            capture="payment",
+        ),
+        Scenario(
+            "payment callback",
+            "GET",
+            "/payments/callback",
+            22,
+            query=lambda ctx: {"authority": ctx["payment"]["payment"]["authority"], "status": "OK"},
+        ),
+        Scenario(
+            "archived payment callback",
+            "GET",
+            "/payments/callback",
+            4,
+            query=lambda ctx: {"authority": ctx["archived_authority"], "status": "OK"},
+        ),
+        Scenario(
+            "analytics summary",
+            "GET",
+            lambda ctx: f"/analytics/projects/{ctx['project_id']}/summary",
+            3,
+            auth=True,
+        ),
+        Scenario(
+            "analytics daily",
+            "GET",
+            lambda ctx: f"/analytics/projects/{ctx['project_id']}/daily",
+            3,
+            auth=True,
+        ),
+        Scenario(
+            "export events",
+            "GET",
+            "/events/export",
+            2,
+            query=lambda ctx: {"after_id": ctx["event_cursor"], "limit": 500},
+            auth=True,
+        ),
+        Scenario(
+            "repricing preview",
+            "POST",
+            lambda ctx: f"/projects/{ctx['project_id']}/repricing/preview",
+            4,
+            body=repricing_rules,
+            auth=True,
+        ),
+        Scenario(
+            "repricing apply",
+            "POST",
+            lambda ctx: f"/projects/{ctx['project_id']}/repricing/apply",
+            4,
+            body={"rules": repricing_rules},
+            auth=True,
+        ),
+        Scenario(
+            "logout",
+            "POST",
+            "/auth/logout",
+            5,
+            body=lambda ctx: {"refresh_token": ctx["refreshed"]["refresh_token"]},
+            auth=True,
+        ),
+    ]
+
+
+def seed_large_dataset(db, unit_count: int, seed: int = 7, archive: bool = True) -> dict:
+    """
+    Bulk-inserts projects, units, users, requests, payments and events; returns ids scenarios need.
+    About a quarter of the requests are stale drafts or finished rows; ``archive=False`` leaves them
+    in the hot tables.
+    """
+    from sqlalchemy import func, insert, text
+
+    from .core.security import get_password_hash
+    from .models import (
+        ArchivedPayment,
+        Payment,
+        Project,
+        PurchaseRequest,
+        RevokedToken,
+        StatusEvent,
+        Unit,
+        User,
+        now_utc,
+    )
+    from .services.analytics import rebuild_rollups
+    from .services.archive import ARCHIVABLE_REQUEST_STATUSES, archive_finished_rows
+    from .services.events import month_bucket
+    from .services.search import reindex_projects
+
+    rng = random.Random(seed)
+    now = now_utc()
+    long_ago = now - timedelta(days=800)
+
+    project_count = max(1, unit_count // 1000)
+    titles = ["برج نگین", "شهرک سربندان", "مجتمع آسمان", "پردیس کوثر", "باغ ایرانی"]
+    db.execute(
+        insert(Project),
+        [
+            {
+                "title": f"{titles[index % len(titles)]} {index}",
+                "slug": f"guard-project-{index}",
+                "description": "مجتمع مسکونی با پارکینگ هوشمند و فضای سبز",
+                "address": f"تهران، منطقه {index % 22 + 1}",
+                "status": "pre_sale",
+                "created_at": now,
+            }
+            for index in range(project_count)
+        ],
+    )
+    project_ids = [row[0] for row in db.query(Project.id).order_by(Project.id)]
+
+    statuses = ["available"] * 7 + ["reserved"] * 2 + ["sold"]
+    db.execute(
+        insert(Unit),
+        [
+            {
+                "project_id": project_ids[index % project_count],
+                "unit_code": f"F-{index}" if index % 5 == 0 else f"U-{index}",
+                "floor": index % 30 + 1,
+                "area_m2": 60 + index % 140,
+                "bedrooms": index % 4 + 1,
+                "price": 8_000_000_000 + rng.randrange(0, 10_000_000_000, 1_000_000),
+                "status": statuses[index % len(statuses)] if index % 5 else "available",
+            }
+            for index in range(unit_count)
+        ],
+    )
+
+    password_hash = get_password_hash(GUARD_PASSWORD)
+    user_rows = [
+        {"full_name": f"Buyer {index}", "mobile": f"0912{index:07d}", "hashed_password": password_hash}
+        for index in range(max(10, unit_count // 50))
+    ]
+    user_rows.append({"full_name": "Query Guard", "mobile": GUARD_MOBILE, "hashed_password": password_hash})
+    db.execute(insert(User), [{**row, "created_at": now} for row in user_rows])
+    user_ids = [row[0] for row in db.query(User.id).order_by(User.id)]
+    guard_user_id = db.query(User.id).filter(User.mobile == GUARD_MOBILE).scalar()
+
+    # "F-" units never get requests so scenarios always find a free one.
+    unit_rows = db.query(Unit.id).filter(~Unit.unit_code.startswith("F-")).order_by(Unit.id).all()
+    request_statuses = ["draft", "submitted", "pending_payment", "paid", "cancelled", "rejected"]
+    request_rows = []
+    for position, (unit_id,) in enumerate(unit_rows[: len(unit_rows) // 2]):
+        status = request_statuses[position % len(request_statuses)]
+        stale = status in ARCHIVABLE_REQUEST_STATUSES and position // len(request_statuses) % 2
+        moment = long_ago if stale else now
+        request_rows.append(
+            {
+                "user_id": guard_user_id if position % 40 == 0 else rng.choice(user_ids),
+                "unit_id": unit_id,
+                "status": status,
+                "tracking_code": f"REQ-G{position:010d}",
+                "note": "",
+                "created_at": moment,
+                "updated_at": moment,
+            }
+        )
+    db.execute(insert(PurchaseRequest), request_rows)
+
+    payment_status = {"pending_payment": "initiated", "paid": "success", "cancelled": "failed"}
+    requests = db.query(PurchaseRequest.id, PurchaseRequest.status, PurchaseRequest.updated_at).all()
+    payment_rows = [
+        {
+            "request_id": request_id,
+            "amount": 10_000_000,
+            "gateway": "mock",
+            "authority": f"AUTH-G{request_id:010d}",
+            "status": payment_status[status],
+            "created_at": updated_at,
+            "verified_at": updated_at if status != "pending_payment" else None,
+        }
+        for request_id, status, updated_at in requests
+        if status in payment_status
+    ]
+    db.execute(insert(Payment), payment_rows)
+
+    project_by_unit = dict(db.query(Unit.id, Unit.project_id))
+    unit_by_request = dict(db.query(PurchaseRequest.id, PurchaseRequest.unit_id))
+    db.execute(
+        insert(StatusEvent),
+        [
+            {
+                "month_bucket": month_bucket(row["created_at"]),
+                "entity_type": "purchase_request",
+                "entity_id": request_id,
+                "project_id": project_by_unit[unit_by_request[request_id]],
+                "from_status": None,
+                "to_status": row["status"],
+                "created_at": row["created_at"],
+            }
+            for request_id, row in zip(sorted(unit_by_request), request_rows)
+        ],
+    )
+    db.execute(
+        insert(RevokedToken),
+        [{"jti": f"guard-{index}", "expires_at": now + timedelta(minutes=15)} for index in range(1000)],
+    )
+    reindex_projects(db)
+    rebuild_rollups(db)
+    db.commit()
+
+    if archive:
+        archive_finished_rows(db, timedelta(days=365))
+    archived_authority = db.query(ArchivedPayment.authority).limit(1).scalar()
+    free_unit_id = (
+        db.query(Unit.id)
+        .filter(
+            Unit.project_id == project_ids[0],
+            Unit.unit_code.startswith("F-"),
+            Unit.status == "available",
+        )
+        .order_by(Unit.id)
+        .limit(1)
+        .scalar()
+    )
+    db.execute(text("ANALYZE"))
+    db.commit()
+    return {
+        "project_id": project_ids[0],
+        "free_unit_id": free_unit_id,
+        "archived_authority": archived_authority,
+        "event_cursor": max(0, (db.query(func.max(StatusEvent.id)).scalar() or 0) // 2),
+    }
+
+
+async def asgi_request(
+    app,
+    method: str,
+    path: str,
+    query: dict | None,
+    body: Any,
+    token: str | None,
+    extra_headers: dict[str, str] | None = None,
+):
+    """Drives one request through the ASGI app in-process; returns ``(status, body)``."""
+    headers = [(b"host", b"query-guard")]
+    headers += [(name.lower().encode(), value.encode()) for name, value in (extra_headers or {}).items()]
+    payload = b""
+    if body is not None:
+        payload = json.dumps(body).encode()
+        headers.append((b"content-type", b"application/json"))
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(query or {}).encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("query-guard", 80),
+    }
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    response: dict = {"status": 0, "body": b""}
+    response_complete = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        # Like a real client, only disconnect once the response is complete;
+        # an early disconnect makes StreamingResponse cancel its body.
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    await app(scope, receive, send)
+    return response["status"], response["body"]
+
+
+def use_scratch_database() -> str:
+    """Points the app at a fresh SQLite file; must run before any app module builds its engine."""
+    workdir = tempfile.mkdtemp(prefix="query-guard-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'guard.db')}"
+    os.environ["STAFF_MOBILES"] = json.dumps([GUARD_MOBILE])
+    return workdir
+
+
+def explain(engine, statement: str, parameters: Any) -> list[str]:
+    if isinstance(parameters, list):
+        parameters = parameters[0] if parameters else ()
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(prefix + statement, parameters).all()
+    if engine.dialect.name == "sqlite":
+        return [row[-1] for row in rows]
+    return [row[0] for row in rows]
+
+
+def find_scans(engine, plan: list[str], table_names: set[str]) -> list[str]:
+    """Tables read end to end; scans of subquery results and FTS virtual tables are not counted."""
+    tables = []
+    for line in plan:
+        if engine.dialect.name == "sqlite":
+            match = SQLITE_SCAN.match(line.strip())
+            name = match.group(1) if match else None
+        else:
+            name = line.split("Seq Scan on ", 1)[1].split()[0] if "Seq Scan on " in line else None
+        if name in table_names:
+            tables.append(name)
+    return tables
+
+
+def run_guard(unit_count: int, baseline: dict[str, int] | None = None) -> list[ScenarioReport]:
+    from sqlalchemy import event
+
+    from .core.revocation import revocation_filter
+    from .db import Base, SessionLocal, engine
+    from .main import app
+
+    capture = Capture()
+    table_names = set(Base.metadata.tables)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if capture.active:
+            capture.statements.append((statement, parameters))
+
+    db = SessionLocal()
+    try:
+        ctx = seed_large_dataset(db, unit_count)
+        revocation_filter.sync(db)
+    finally:
+        db.close()
+
+    reports: list[ScenarioReport] = []
+    for scenario in build_scenarios():
+        token = None
+        if scenario.auth:
+            token = (ctx.get("refreshed") or ctx["login"])["access_token"]
+        try:
+            path = "/api/v1" + _resolve(scenario.path, ctx)
+            query, body = _resolve(scenario.query, ctx), _resolve(scenario.body, ctx)
+        except KeyError as exc:
+            report = ScenarioReport(scenario.name, 0, 0, scenario.max_queries)
+            report.failures.append(f"skipped: needs {exc} from an earlier failed step")
+            reports.append(report)
+            continue
+
+        capture.statements = []
+        capture.active = True
+        try:
+            status, body = asyncio.run(asgi_request(app, scenario.method, path, query, body, token))
+        finally:
+            capture.active = False
+
+        report = ScenarioReport(scenario.name, status, len(capture.statements), scenario.max_queries)
+        if status >= 400:
+            report.failures.append(f"HTTP {status}: {body[:200]!r}")
+        elif status == 200 and not body:
+            report.failures.append("HTTP 200 with an empty body")
+        if scenario.capture and status < 400:
+            ctx[scenario.capture] = json.loads(body)
+
+        if report.queries > scenario.max_queries:
+            report.failures.append(f"{report.queries} queries exceeds budget of {scenario.max_queries}")
+        if baseline and scenario.name in baseline and report.queries > baseline[scenario.name]:
+            report.failures.append(f"{report.queries} queries, baseline was {baseline[scenario.name]}")
+
+        for statement, parameters in capture.statements:
+            if not statement.lstrip().upper().startswith(EXPLAINED_PREFIXES):
+                continue
+            plan = explain(engine, statement, parameters)
+            if any("USE TEMP B-TREE" in line for line in plan):
+                report.notes.append(f"temp b-tree: {' '.join(statement.split())[:120]}")
+            for table in find_scans(engine, plan, table_names):
+                report.scans.append(table)
+                if table not in scenario.allowed_scans:
+                    report.failures.append(f"full scan of {table}: {' '.join(statement.split())[:160]}")
+        reports.append(report)
+    return reports
+
+
+def print_report(reports: list[ScenarioReport]) -> None:
+    width = max(len(report.name) for report in reports)
+    for report in reports:
+        verdict = "FAIL" if report.failures else "ok"
+        scans = ",".join(sorted(set(report.scans))) or "-"
+        print(
+            f"{report.name:<{width}}  {verdict:<4}  http={report.status}  "
+            f"queries={report.queries}/{report.max_queries}  scans={scans}"
+        )
+        for line in report.failures:
+            print(f"    ! {line}")
+        for line in report.notes:
+            print(f"    . {line}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.query_guard")
+    parser.add_argument("--units", type=int, default=20000, help="number of units to seed")
+    parser.add_argument("--baseline", help="JSON file of per-endpoint query counts that must not grow")
+    parser.add_argument("--write-baseline", help="write observed query counts to this JSON file")
+    parser.add_argument("--report", help="write the full per-endpoint report as JSON")
+    args = parser.parse_args(argv)
+
+    use_scratch_database()
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+
+    started = datetime.now(timezone.utc)
+    reports = run_guard(args.units, baseline)
+    print_report(reports)
+    elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+    print(f"{len(reports)} endpoints checked in {elapsed:.1f}s")
+
+    if args.write_baseline:
+        with open(args.write_baseline, "w", encoding="utf-8") as handle:
+            counts = {report.name: report.queries for report in reports}
+            json.dump(counts, handle, indent=2, ensure_ascii=False)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as handle:
+            json.dump([report.__dict__ for report in reports], handle, indent=2, ensure_ascii=False)
+    return 1 if any(report.failures for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
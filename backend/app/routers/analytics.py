@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from ..deps import ensure_project, get_db, get_staff_user
+from ..models import ProjectCounter, ProjectDailyCounter, User
+from ..schemas import ProjectAnalyticsSummary, ProjectDailyAnalytics
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+MAX_DAILY_RANGE_DAYS = 366
+
+
+@router.get("/projects/{project_id}/summary", response_model=ProjectAnalyticsSummary)
+def project_summary(
+    project_id: int,
+    db: Session = Depends(get_db),
+    _staff: User = Depends(get_staff_user),
+):
+    ensure_project(db, project_id)
+    rows = (
+        db.query(ProjectCounter.name, ProjectCounter.value)
+        .filter(ProjectCounter.project_id == project_id)
+        .all()
+    )
+    return ProjectAnalyticsSummary(project_id=project_id, counters={name: value for name, value in rows})
+
+
+@router.get("/projects/{project_id}/daily", response_model=list[ProjectDailyAnalytics])
+def project_daily(
+    project_id: int,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    db: Session = Depends(get_db),
+    _staff: User = Depends(get_staff_user),
+):
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    if (date_to - date_from).days >= MAX_DAILY_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail="Date range too large")
+    ensure_project(db, project_id)
+
+    rows = (
+        db.query(ProjectDailyCounter.day, ProjectDailyCounter.name, ProjectDailyCounter.value)
+        .filter(
+            ProjectDailyCounter.project_id == project_id,
+            ProjectDailyCounter.day >= date_from,
+            ProjectDailyCounter.day <= date_to,
+        )
+        .order_by(ProjectDailyCounter.day)
+        .all()
+    )
+    by_day: dict[date, dict[str, int]] = defaultdict(dict)
+    for day, name, value in rows:
+        by_day[day][name] = value
+    return [ProjectDailyAnalytics(day=day, counters=counters) for day, counters in by_day.items()]
@@ -1,16 +1,29 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from ..core.security import create_access_token, get_password_hash, verify_password
-from ..deps import get_current_user, get_db
-from ..models import User
-from ..schemas import TokenOut, UserLogin, UserOut, UserRegister
+from ..core.config import settings
+from ..core.security import decode_access_token, get_password_hash, hash_refresh_token, verify_password
+from ..deps import get_current_user, get_db, optional_oauth2_scheme
+from ..models import RefreshToken, User
+from ..schemas import LogoutIn, RefreshTokenIn, TokenOut, UserLogin, UserOut, UserRegister
+from ..services.tokens import issue_tokens, revoke_access_token, revoke_refresh_family, rotate_refresh_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def build_token_out(user: User, access_token: str, refresh_token: str) -> TokenOut:
+    return TokenOut(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        expires_in=settings.access_token_expire_minutes * 60,
+        user=UserOut.model_validate(user),
+    )
+
+
 @router.post("/register", response_model=TokenOut, status_code=status.HTTP_201_CREATED)
 def register(payload: UserRegister, db: Session = Depends(get_db)):
     normalized_email = payload.email.strip().lower() if payload.email else None
@@ -32,8 +45,8 @@ def register(payload: UserRegister, db: Session = Depends(get_db)):
     db.add(user)
     db.commit()
     db.refresh(user)
-    token = create_access_token(str(user.id))
-    return TokenOut(access_token=token, user=UserOut.model_validate(user))
+    access_token, refresh_token = issue_tokens(db, user)
+    return build_token_out(user, access_token, refresh_token)
 
 
 @router.post("/login", response_model=TokenOut)
@@ -41,8 +54,52 @@ def login(payload: UserLogin, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.mobile == payload.mobile).first()
     if not user or not verify_password(payload.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid mobile or password")
-    token = create_access_token(str(user.id))
-    return TokenOut(access_token=token, user=UserOut.model_validate(user))
+    access_token, refresh_token = issue_tokens(db, user)
+    return build_token_out(user, access_token, refresh_token)
+
+
+@router.post("/refresh", response_model=TokenOut)
+def refresh(payload: RefreshTokenIn, db: Session = Depends(get_db)):
+    try:
+        user, access_token, refresh_token = rotate_refresh_token(db, payload.refresh_token)
+    except ValueError as exc:
+        raise HTTPException(status_code=401, detail="Invalid refresh token") from exc
+    return build_token_out(user, access_token, refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    payload: LogoutIn | None = None,
+    token: str | None = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db),
+):
+    """
+    Revokes the refresh-token family and, when the bearer token is still
+    valid, the access token. Holding the refresh token is proof enough, so
+    logging out works after the short-lived access token has expired.
+    """
+    revoked = False
+    claims = None
+    if token:
+        try:
+            claims = decode_access_token(token)
+        except ValueError:
+            claims = None
+    if claims and claims.get("jti"):
+        revoke_access_token(db, claims["jti"], datetime.fromtimestamp(claims["exp"], timezone.utc))
+        revoked = True
+    if payload and payload.refresh_token:
+        row = (
+            db.query(RefreshToken)
+            .filter(RefreshToken.token_hash == hash_refresh_token(payload.refresh_token))
+            .first()
+        )
+        if row:
+            revoke_refresh_family(db, row.family_id)
+            revoked = True
+    if not revoked:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Nothing to revoke")
+    db.commit()
 
 
 @router.get("/me", response_model=UserOut)
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from ..deps import get_staff_user
+from ..models import User
+from ..services.events import iter_events_ndjson
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.get("/export")
+def export_events(
+    after_id: int = Query(0, ge=0),
+    month_from: int | None = Query(None, ge=190001, le=999912),
+    month_to: int | None = Query(None, ge=190001, le=999912),
+    entity_type: str | None = None,
+    limit: int | None = Query(None, ge=1),
+    _staff: User = Depends(get_staff_user),
+):
+    return StreamingResponse(
+        iter_events_ndjson(
+            after_id=after_id,
+            month_from=month_from,
+            month_to=month_to,
+            entity_type=entity_type,
+            limit=limit,
+        ),
+        media_type="application/x-ndjson",
+    )
@@ -9,7 +9,14 @@ from sqlalchemy.orm import Session, joinedload
 from ..deps import get_current_user, get_db
 from ..models import Payment, PurchaseRequest, Unit, User
 from ..schemas import PaymentInitRequest, PaymentInitResponse, PaymentOut
-from ..services.payment import build_mock_gateway_url, create_authority, create_reference_id
+from ..services.archive import find_archived_payment, find_request_status
+from ..services.events import record_transition
+from ..services.payment import (
+    build_mock_gateway_url,
+    calculate_deposit,
+    create_authority,
+    create_reference_id,
+)
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
@@ -44,7 +51,7 @@ def initiate_payment(
         )
 
     authority = create_authority()
-    amount = int(max(request_row.unit.price * 0.05, 10000000))
+    amount = calculate_deposit(request_row.unit.price)
 
     payment = Payment(
         request_id=request_row.id,
@@ -53,9 +60,29 @@ def initiate_payment(
         authority=authority,
         status="initiated",
     )
+    db.add(payment)
+    db.flush()
+    project_id = request_row.unit.project_id
+    record_transition(
+        db,
+        "payment",
+        payment.id,
+        "initiated",
+        project_id=project_id,
+        amount=payment.amount,
+        actor_user_id=current_user.id,
+    )
+    record_transition(
+        db,
+        "purchase_request",
+        request_row.id,
+        "pending_payment",
+        from_status=request_row.status,
+        project_id=project_id,
+        actor_user_id=current_user.id,
+    )
     request_row.status = "pending_payment"
     request_row.updated_at = datetime.now(timezone.utc)
-    db.add(payment)
     db.commit()
     db.refresh(payment)
     db.refresh(request_row)
@@ -104,7 +131,16 @@ def payment_callback(
 ):
     payment = db.query(Payment).filter(Payment.authority == authority).first()
     if not payment:
-        raise HTTPException(status_code=404, detail="Payment not found")
+        archived = find_archived_payment(db, authority)
+        if not archived:
+            raise HTTPException(status_code=404, detail="Payment not found")
+        return {
+            "ok": archived.status == "success",
+            "request_status": find_request_status(db, archived.request_id),
+            "payment_status": archived.status,
+            "ref_id": archived.ref_id,
+            "message": "نتیجه این پرداخت قبلا ثبت شده است",
+        }
 
     request_row = db.query(PurchaseRequest).filter(PurchaseRequest.id == payment.request_id).first()
     if not request_row:
@@ -123,6 +159,9 @@ def payment_callback(
             "message": "پرداخت قبلا تایید شده است",
         }
 
+    previous_payment_status = payment.status
+    previous_request_status = request_row.status
+    previous_unit_status = unit.status
     if status.upper() == "OK":
         payment.status = "success"
         payment.ref_id = create_reference_id()
@@ -136,6 +175,32 @@ def payment_callback(
         request_row.status = "submitted"
         request_row.updated_at = datetime.now(timezone.utc)
 
+    record_transition(
+        db,
+        "payment",
+        payment.id,
+        payment.status,
+        from_status=previous_payment_status,
+        project_id=unit.project_id,
+        amount=payment.amount,
+    )
+    record_transition(
+        db,
+        "purchase_request",
+        request_row.id,
+        request_row.status,
+        from_status=previous_request_status,
+        project_id=unit.project_id,
+    )
+    record_transition(
+        db,
+        "unit",
+        unit.id,
+        unit.status,
+        from_status=previous_unit_status,
+        project_id=unit.project_id,
+    )
+
     db.commit()
     return {
         "ok": status.upper() == "OK",
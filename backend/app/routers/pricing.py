@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from ..deps import ensure_project, get_db, get_staff_user
+from ..models import User
+from ..schemas import PricingRuleSet, RepricingApplyRequest, RepricingPreview, RepricingResult
+from ..services.pricing import PriceOutOfRange, apply_repricing, preview_repricing
+
+router = APIRouter(prefix="/projects/{project_id}/repricing", tags=["pricing"])
+
+
+@router.post("/preview", response_model=RepricingPreview)
+def preview(
+    project_id: int,
+    rules: PricingRuleSet,
+    db: Session = Depends(get_db),
+    _staff: User = Depends(get_staff_user),
+):
+    ensure_project(db, project_id)
+    try:
+        return RepricingPreview(**preview_repricing(db, project_id, rules))
+    except PriceOutOfRange as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
+@router.post("/apply", response_model=RepricingResult)
+def apply(
+    project_id: int,
+    payload: RepricingApplyRequest,
+    db: Session = Depends(get_db),
+    _staff: User = Depends(get_staff_user),
+):
+    ensure_project(db, project_id)
+    try:
+        result = apply_repricing(db, project_id, payload.rules, payload.fingerprint)
+    except PriceOutOfRange as exc:
+        db.rollback()
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    except ValueError as exc:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    db.commit()
+    return RepricingResult(**result)
@@ -1,34 +1,26 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import case, func
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session, joinedload
 
 from ..deps import get_db
 from ..models import Project, Unit
-from ..schemas import ProjectListItem, ProjectOut, UnitOut
+from ..schemas import ProjectListItem, ProjectOut, ProjectSearchHit, ProjectSearchPage, UnitOut
 from ..services.cad import build_viewer_hints
+from ..services.search import search_projects
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 
 @router.get("", response_model=list[ProjectListItem])
 def list_projects(db: Session = Depends(get_db)):
-    units_agg = (
-        db.query(
-            Unit.project_id.label("project_id"),
-            func.sum(case((Unit.status == "available", 1), else_=0)).label("available_units"),
-            func.min(case((Unit.status == "available", Unit.price), else_=None)).label("min_price"),
-        )
-        .group_by(Unit.project_id)
-        .subquery()
-    )
-    rows = (
-        db.query(Project, units_agg.c.available_units, units_agg.c.min_price)
-        .outerjoin(units_agg, units_agg.c.project_id == Project.id)
-        .order_by(Project.id.desc())
-        .all()
-    )
+    # Correlated aggregates are answered from ix_units_project_status_price per
+    # project instead of grouping the whole units table.
+    available = (Unit.project_id == Project.id, Unit.status == "available")
+    available_count = select(func.count()).where(*available).correlate(Project).scalar_subquery()
+    available_min_price = select(func.min(Unit.price)).where(*available).correlate(Project).scalar_subquery()
+    rows = db.query(Project, available_count, available_min_price).order_by(Project.id.desc()).all()
     result: list[ProjectListItem] = []
     for project, available_units, min_price in rows:
         result.append(
@@ -47,6 +39,34 @@ def list_projects(db: Session = Depends(get_db)):
     return result
 
 
+@router.get("/search", response_model=ProjectSearchPage)
+def search(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    total, hits = search_projects(db, q, limit, offset)
+    projects = {}
+    if hits:
+        rows = db.query(Project).filter(Project.id.in_([project_id for project_id, _ in hits])).all()
+        projects = {project.id: project for project in rows}
+    items = [
+        ProjectSearchHit(
+            id=project.id,
+            title=project.title,
+            slug=project.slug,
+            address=project.address,
+            status=project.status,
+            cover_image=project.cover_image,
+            rank=rank,
+        )
+        for project_id, rank in hits
+        if (project := projects.get(project_id)) is not None
+    ]
+    return ProjectSearchPage(total=total, limit=limit, offset=offset, items=items)
+
+
 @router.get("/{project_id}", response_model=ProjectOut)
 def get_project(project_id: int, db: Session = Depends(get_db)):
     project = (
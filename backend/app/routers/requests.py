@@ -9,6 +9,8 @@ from sqlalchemy.orm import Session, joinedload
 from ..deps import get_current_user, get_db
 from ..models import PurchaseRequest, Unit, User
 from ..schemas import PurchaseRequestCreate, PurchaseRequestOut
+from ..services.archive import archived_requests_for_user
+from ..services.events import record_transition
 
 router = APIRouter(prefix="/requests", tags=["requests"])
 
@@ -59,6 +61,15 @@ def create_request(
         tracking_code=create_tracking_code(),
     )
     db.add(request_row)
+    db.flush()
+    record_transition(
+        db,
+        "purchase_request",
+        request_row.id,
+        request_row.status,
+        project_id=unit.project_id,
+        actor_user_id=current_user.id,
+    )
     db.commit()
     request_row = (
         db.query(PurchaseRequest)
@@ -80,6 +91,9 @@ def my_requests(db: Session = Depends(get_db), current_user: User = Depends(get_
         .order_by(PurchaseRequest.created_at.desc())
         .all()
     )
+    archived = archived_requests_for_user(db, current_user.id)
+    if archived:
+        rows = sorted([*rows, *archived], key=lambda item: item.created_at, reverse=True)
     return [PurchaseRequestOut.model_validate(item) for item in rows]
 
 
@@ -100,6 +114,15 @@ def submit_request(
     if row.status in ["paid", "cancelled", "rejected"]:
         raise HTTPException(status_code=409, detail="Request can not be submitted")
 
+    record_transition(
+        db,
+        "purchase_request",
+        row.id,
+        "submitted",
+        from_status=row.status,
+        project_id=row.unit.project_id,
+        actor_user_id=current_user.id,
+    )
     row.status = "submitted"
     row.updated_at = datetime.now(timezone.utc)
     db.commit()
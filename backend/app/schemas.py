@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
+from typing import Annotated
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -28,10 +30,20 @@ class UserOut(BaseModel):
 
 class TokenOut(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
+    expires_in: int
     user: UserOut
 
 
+class RefreshTokenIn(BaseModel):
+    refresh_token: str
+
+
+class LogoutIn(BaseModel):
+    refresh_token: str | None = None
+
+
 class FloorPlanOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -85,6 +97,25 @@ class ProjectListItem(BaseModel):
     min_price: int | None
 
 
+class ProjectSearchHit(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    slug: str
+    address: str
+    status: str
+    cover_image: str | None
+    rank: float
+
+
+class ProjectSearchPage(BaseModel):
+    total: int
+    limit: int
+    offset: int
+    items: list[ProjectSearchHit]
+
+
 class PurchaseRequestCreate(BaseModel):
     unit_id: int
     note: str = ""
@@ -126,3 +157,60 @@ class PaymentOut(BaseModel):
 class PaymentInitResponse(BaseModel):
     payment: PaymentOut
     payment_url: str
+
+
+class ProjectAnalyticsSummary(BaseModel):
+    project_id: int
+    counters: dict[str, int]
+
+
+class ProjectDailyAnalytics(BaseModel):
+    day: date
+    counters: dict[str, int]
+
+
+class AreaTier(BaseModel):
+    min_area_m2: float = Field(ge=0)
+    premium_pct: float = Field(gt=-100)
+
+
+class PricingRuleSet(BaseModel):
+    statuses: list[str] = ["available"]
+    price_per_m2: int | None = Field(default=None, gt=0)
+    base_floor: int = 1
+    floor_premium_pct: float = Field(default=0.0, gt=-100)
+    bedroom_premium_pct: dict[int, Annotated[float, Field(gt=-100)]] = {}
+    area_tiers: list[AreaTier] = []
+    market_index: float = Field(default=1.0, gt=0)
+    max_change_pct: float | None = Field(default=None, ge=0)
+    round_to: int = Field(default=1_000_000, ge=1)
+
+
+class RepricingApplyRequest(BaseModel):
+    rules: PricingRuleSet
+    fingerprint: str | None = None
+
+
+class UnitPriceChange(BaseModel):
+    unit_id: int
+    unit_code: str
+    old_price: int
+    new_price: int
+
+
+class RepricingPreview(BaseModel):
+    project_id: int
+    fingerprint: str
+    units_matched: int
+    units_changed: int
+    total_before: int
+    total_after: int
+    min_price_after: int | None
+    max_price_after: int | None
+    sample: list[UnitPriceChange]
+
+
+class RepricingResult(BaseModel):
+    project_id: int
+    units_updated: int
+    total_after: int
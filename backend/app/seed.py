@@ -5,6 +5,8 @@ from sqlalchemy.orm import Session
 from .core.security import get_password_hash
 from .db import Base, SessionLocal, engine
 from .models import FloorPlan, Project, Unit, User
+from .services.analytics import rebuild_rollups
+from .services.search import ensure_search_index
 
 
 def seed(db: Session):
@@ -38,12 +40,15 @@ def seed(db: Session):
         hashed_password=get_password_hash("Onepay123!"),
     )
     db.add(demo_user)
+    db.flush()
 
+    rebuild_rollups(db)
     db.commit()
 
 
 def main():
     Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
     db = SessionLocal()
     try:
         seed(db)
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, time, timezone
+
+from sqlalchemy import case, delete, func, insert, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from ..models import (
+    ArchivedPayment,
+    ArchivedPurchaseRequest,
+    Payment,
+    ProjectCounter,
+    ProjectDailyCounter,
+    PurchaseRequest,
+    StatusEvent,
+    Unit,
+)
+
+DEPOSITS_COLLECTED = "deposits_collected"
+DEPOSIT_TRANSITION = ("payment", "success")
+
+_UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def counter_name(entity_type: str, status: str) -> str:
+    return f"{entity_type}.{status}"
+
+
+def _increment(db: Session, model: type, keys: dict, delta: int) -> None:
+    if not delta:
+        return
+    table = model.__table__
+    upsert_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if upsert_insert is not None:
+        stmt = upsert_insert(table).values(**keys, value=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={"value": table.c.value + stmt.excluded.value},
+        )
+        db.execute(stmt)
+        return
+
+    result = db.execute(
+        update(table)
+        .where(*[table.c[key] == value for key, value in keys.items()])
+        .values(value=table.c.value + delta)
+    )
+    if result.rowcount == 0:
+        db.execute(insert(table).values(**keys, value=delta))
+
+
+def _bump(db: Session, project_id: int, day: date, name: str, delta: int, daily: bool = True) -> None:
+    _increment(db, ProjectCounter, {"project_id": project_id, "name": name}, delta)
+    if daily:
+        _increment(db, ProjectDailyCounter, {"project_id": project_id, "day": day, "name": name}, delta)
+
+
+def apply_transition(
+    db: Session,
+    project_id: int,
+    entity_type: str,
+    to_status: str,
+    from_status: str | None = None,
+    amount: int | None = None,
+    day: date | None = None,
+) -> None:
+    """Applies one status transition to the rollup tables inside the caller's transaction."""
+    day = day or datetime.now(timezone.utc).date()
+    if from_status:
+        _bump(db, project_id, day, counter_name(entity_type, from_status), -1, daily=False)
+    _bump(db, project_id, day, counter_name(entity_type, to_status), 1)
+    if (entity_type, to_status) == DEPOSIT_TRANSITION and amount:
+        _bump(db, project_id, day, DEPOSITS_COLLECTED, amount)
+
+
+def _as_date(value: date | str) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def recompute_counters(db: Session) -> dict[tuple[int, str], int]:
+    """Full recomputation of the running totals from the base tables."""
+    result: dict[tuple[int, str], int] = defaultdict(int)
+    unit_rows = db.query(Unit.project_id, Unit.status, func.count()).group_by(Unit.project_id, Unit.status)
+    for project_id, status, count in unit_rows:
+        result[(project_id, counter_name("unit", status))] += count
+
+    # Archived rows still count: the archiver moves rows without emitting transitions.
+    for request_model in (PurchaseRequest, ArchivedPurchaseRequest):
+        request_rows = (
+            db.query(Unit.project_id, request_model.status, func.count())
+            .join(Unit, Unit.id == request_model.unit_id)
+            .group_by(Unit.project_id, request_model.status)
+        )
+        for project_id, status, count in request_rows:
+            result[(project_id, counter_name("purchase_request", status))] += count
+
+        for payment_model in (Payment, ArchivedPayment):
+            payment_rows = (
+                db.query(Unit.project_id, payment_model.status, func.count(), func.sum(payment_model.amount))
+                .join(request_model, request_model.id == payment_model.request_id)
+                .join(Unit, Unit.id == request_model.unit_id)
+                .group_by(Unit.project_id, payment_model.status)
+            )
+            for project_id, status, count, amount in payment_rows:
+                result[(project_id, counter_name("payment", status))] += count
+                if ("payment", status) == DEPOSIT_TRANSITION:
+                    result[(project_id, DEPOSITS_COLLECTED)] += int(amount or 0)
+    return dict(result)
+
+
+def recompute_daily(db: Session, since: date | None = None) -> dict[tuple[int, date, str], int]:
+    """Full recomputation of the daily counters by replaying ``status_events``."""
+    day_column = func.date(StatusEvent.created_at)
+    is_deposit = (StatusEvent.entity_type == DEPOSIT_TRANSITION[0]) & (
+        StatusEvent.to_status == DEPOSIT_TRANSITION[1]
+    )
+    query = db.query(
+        StatusEvent.project_id,
+        day_column,
+        StatusEvent.entity_type,
+        StatusEvent.to_status,
+        func.count(),
+        func.sum(case((is_deposit, StatusEvent.amount), else_=0)),
+    ).filter(StatusEvent.project_id.is_not(None))
+    if since is not None:
+        query = query.filter(StatusEvent.created_at >= datetime.combine(since, time.min, tzinfo=timezone.utc))
+    query = query.group_by(StatusEvent.project_id, day_column, StatusEvent.entity_type, StatusEvent.to_status)
+
+    result: dict[tuple[int, date, str], int] = defaultdict(int)
+    for project_id, day, entity_type, to_status, count, deposits in query:
+        day = _as_date(day)
+        result[(project_id, day, counter_name(entity_type, to_status))] += count
+        if deposits:
+            result[(project_id, day, DEPOSITS_COLLECTED)] += int(deposits)
+    return dict(result)
+
+
+def rebuild_rollups(db: Session, since: date | None = None) -> None:
+    """
+    Rewrites the rollup tables from scratch. With ``since`` only daily rows
+    from that day onwards are replayed; running totals are always rebuilt.
+    """
+    counters = recompute_counters(db)
+    db.execute(delete(ProjectCounter))
+    if counters:
+        db.execute(
+            insert(ProjectCounter),
+            [{"project_id": pid, "name": name, "value": value} for (pid, name), value in counters.items()],
+        )
+
+    daily = recompute_daily(db, since)
+    cleanup = delete(ProjectDailyCounter)
+    if since is not None:
+        cleanup = cleanup.where(ProjectDailyCounter.day >= since)
+    db.execute(cleanup)
+    if daily:
+        db.execute(
+            insert(ProjectDailyCounter),
+            [
+                {"project_id": pid, "day": day, "name": name, "value": value}
+                for (pid, day, name), value in daily.items()
+            ],
+        )
+
+
+def ensure_rollups(bind: Engine) -> bool:
+    """
+    Builds the rollups once on a database that predates them. Transitions
+    only apply deltas, so starting from empty counters would drive them
+    negative. Returns True when this call did the rebuild.
+    """
+    with Session(bind) as db:
+        if db.query(ProjectCounter.project_id).first() is not None:
+            return False
+        if db.query(Unit.id).first() is None:
+            return False
+        rebuild_rollups(db)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker starting at the same time got there first.
+            db.rollback()
+            return False
+    return True
+
+
+def verify_rollups(db: Session) -> list[str]:
+    """Compares the incrementally maintained rollups with a full recomputation."""
+    mismatches: list[str] = []
+
+    stored_counters = {(row.project_id, row.name): row.value for row in db.query(ProjectCounter)}
+    expected_counters = recompute_counters(db)
+    for key in sorted(set(stored_counters) | set(expected_counters)):
+        stored, expected = stored_counters.get(key, 0), expected_counters.get(key, 0)
+        if stored != expected:
+            mismatches.append(f"project {key[0]} {key[1]}: stored={stored} expected={expected}")
+
+    stored_daily = {(row.project_id, row.day, row.name): row.value for row in db.query(ProjectDailyCounter)}
+    expected_daily = recompute_daily(db)
+    for key in sorted(set(stored_daily) | set(expected_daily)):
+        stored, expected = stored_daily.get(key, 0), expected_daily.get(key, 0)
+        if stored != expected:
+            mismatches.append(f"project {key[0]} {key[1]} {key[2]}: stored={stored} expected={expected}")
+    return mismatches
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, exists, func, insert, literal, select
+from sqlalchemy.orm import Session, joinedload
+
+from ..models import ArchivedPayment, ArchivedPurchaseRequest, Payment, PurchaseRequest, Unit
+from .events import record_transition
+
+# Drafts are not terminal; expire_stale_drafts cancels abandoned ones first.
+ARCHIVABLE_REQUEST_STATUSES = ("cancelled", "rejected")
+ARCHIVABLE_PAYMENT_STATUSES = ("success", "failed")
+
+
+def _move_batch(db: Session, source: type, target: type, ids: list[int]) -> None:
+    source_table = source.__table__
+    names = [column.name for column in source_table.columns]
+    archived_at = literal(datetime.now(timezone.utc), target.archived_at.type)
+    rows = select(*source_table.columns, archived_at).where(source_table.c.id.in_(ids))
+    db.execute(insert(target.__table__).from_select(names + ["archived_at"], rows))
+    db.execute(delete(source_table).where(source_table.c.id.in_(ids)))
+
+
+def _archive(db: Session, source: type, target: type, conditions: list, batch_size: int) -> int:
+    # Never move the newest row: SQLite reuses max(rowid) + 1 after a delete,
+    # which would hand an archived id to a new hot row.
+    newest = select(func.max(source.id)).scalar_subquery()
+    query = select(source.id).where(*conditions, source.id < newest).order_by(source.id).limit(batch_size)
+    moved = 0
+    while True:
+        ids = list(db.execute(query).scalars())
+        if not ids:
+            return moved
+        _move_batch(db, source, target, ids)
+        db.commit()
+        moved += len(ids)
+
+
+def expire_stale_drafts(db: Session, older_than: timedelta, batch_size: int = 1000) -> int:
+    """
+    Cancels drafts nobody has touched since the cutoff, recording each
+    transition so the event log and rollups stay in step. Commits per
+    batch; the cancelled rows are archived once they age past the archive
+    cutoff like any other finished request. Returns the number cancelled.
+    """
+    cutoff = datetime.now(timezone.utc) - older_than
+    query = (
+        db.query(PurchaseRequest, Unit.project_id)
+        .join(Unit, Unit.id == PurchaseRequest.unit_id)
+        .filter(PurchaseRequest.status == "draft", PurchaseRequest.updated_at < cutoff)
+        .order_by(PurchaseRequest.id)
+        .limit(batch_size)
+    )
+    expired = 0
+    while True:
+        rows = query.all()
+        if not rows:
+            return expired
+        now = datetime.now(timezone.utc)
+        for request_row, project_id in rows:
+            record_transition(
+                db,
+                "purchase_request",
+                request_row.id,
+                "cancelled",
+                from_status="draft",
+                project_id=project_id,
+            )
+            request_row.status = "cancelled"
+            request_row.updated_at = now
+        db.commit()
+        expired += len(rows)
+
+
+def archive_finished_rows(db: Session, older_than: timedelta, batch_size: int = 1000) -> tuple[int, int]:
+    """
+    Moves terminal payments, then terminal purchase requests that have no
+    payment left in the hot table, into the archive tables. Each batch is
+    copied and deleted in its own transaction so the hot tables are never
+    locked for long. Returns ``(requests_moved, payments_moved)``.
+    """
+    cutoff = datetime.now(timezone.utc) - older_than
+    payments_moved = _archive(
+        db,
+        Payment,
+        ArchivedPayment,
+        [
+            Payment.status.in_(ARCHIVABLE_PAYMENT_STATUSES),
+            func.coalesce(Payment.verified_at, Payment.created_at) < cutoff,
+        ],
+        batch_size,
+    )
+    requests_moved = _archive(
+        db,
+        PurchaseRequest,
+        ArchivedPurchaseRequest,
+        [
+            PurchaseRequest.status.in_(ARCHIVABLE_REQUEST_STATUSES),
+            PurchaseRequest.updated_at < cutoff,
+            ~exists().where(Payment.request_id == PurchaseRequest.id),
+        ],
+        batch_size,
+    )
+    return requests_moved, payments_moved
+
+
+def find_request_status(db: Session, request_id: int) -> str | None:
+    for model in (PurchaseRequest, ArchivedPurchaseRequest):
+        status = db.query(model.status).filter(model.id == request_id).scalar()
+        if status is not None:
+            return status
+    return None
+
+
+def find_archived_payment(db: Session, authority: str) -> ArchivedPayment | None:
+    return db.query(ArchivedPayment).filter(ArchivedPayment.authority == authority).first()
+
+
+def archived_requests_for_user(db: Session, user_id: int) -> list[ArchivedPurchaseRequest]:
+    return (
+        db.query(ArchivedPurchaseRequest)
+        .options(joinedload(ArchivedPurchaseRequest.unit))
+        .filter(ArchivedPurchaseRequest.user_id == user_id)
+        .all()
+    )
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import datetime
+import json
+
+from sqlalchemy import Connection, Select, func, select
+from sqlalchemy.orm import Session
+
+from ..db import engine
+from ..models import StatusEvent, now_utc
+from .analytics import apply_transition
+
+EXPORT_BATCH_SIZE = 2000
+
+
+def month_bucket(moment: datetime) -> int:
+    return moment.year * 100 + moment.month
+
+
+def record_transition(
+    db: Session,
+    entity_type: str,
+    entity_id: int,
+    to_status: str,
+    from_status: str | None = None,
+    project_id: int | None = None,
+    amount: int | None = None,
+    actor_user_id: int | None = None,
+) -> StatusEvent | None:
+    """
+    Adds an event row to the caller's session so it is committed (or rolled
+    back) together with the status change it describes. Project-scoped
+    events also update the analytics rollups in the same transaction.
+    """
+    if from_status == to_status:
+        return None
+    moment = now_utc()
+    event = StatusEvent(
+        month_bucket=month_bucket(moment),
+        entity_type=entity_type,
+        entity_id=entity_id,
+        project_id=project_id,
+        from_status=from_status,
+        to_status=to_status,
+        amount=amount,
+        actor_user_id=actor_user_id,
+        created_at=moment,
+    )
+    db.add(event)
+    if project_id is not None:
+        apply_transition(db, project_id, entity_type, to_status, from_status, amount, moment.date())
+    return event
+
+
+def _month_after(conn: Connection, month: int, month_to: int | None, inclusive: bool = False) -> int | None:
+    columns = StatusEvent.__table__.c
+    stmt = select(func.min(columns.month_bucket)).where(
+        columns.month_bucket >= month if inclusive else columns.month_bucket > month
+    )
+    if month_to is not None:
+        stmt = stmt.where(columns.month_bucket <= month_to)
+    return conn.execute(stmt).scalar()
+
+
+def _event_pages(
+    conn: Connection,
+    base: Select,
+    after_id: int,
+    month_from: int | None,
+    month_to: int | None,
+    batch_size: int,
+) -> Iterator[list]:
+    columns = StatusEvent.__table__.c
+    cursor_id = after_id
+    if month_from is None and month_to is None:
+        while True:
+            rows = conn.execute(base.where(columns.id > cursor_id)).mappings().all()
+            if not rows:
+                return
+            yield rows
+            if len(rows) < batch_size:
+                return
+            cursor_id = rows[-1]["id"]
+
+    # Walk one month at a time: an equality on month_bucket plus ``id >``
+    # is a true seek on ix_status_events_month_id, whereas a row-value
+    # (month_bucket, id) comparison is only used for its first column and
+    # degrades to rescanning the month on every batch.
+    month = month_from or 0
+    if after_id:
+        resumed_month = conn.execute(
+            select(columns.month_bucket).where(columns.id == after_id)
+        ).scalar_one_or_none()
+        month = max(month, resumed_month or 0)
+    month = _month_after(conn, month, month_to, inclusive=True)
+    while month is not None:
+        rows = conn.execute(
+            base.where(columns.month_bucket == month, columns.id > cursor_id)
+        ).mappings().all()
+        if rows:
+            yield rows
+            cursor_id = rows[-1]["id"]
+        if len(rows) < batch_size:
+            month = _month_after(conn, month, month_to)
+            cursor_id = 0
+
+
+def iter_events_ndjson(
+    after_id: int = 0,
+    month_from: int | None = None,
+    month_to: int | None = None,
+    entity_type: str | None = None,
+    limit: int | None = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[str]:
+    """
+    Yields one JSON line per event in keyset batches so memory stays flat no
+    matter how many rows match. Without month bounds the walk follows the
+    primary key; with them it follows (month_bucket, id) so every batch is a
+    seek on ix_status_events_month_id rather than a re-sort of the range.
+    Uses its own connection because the request-scoped session is closed
+    before the response body is streamed.
+    """
+    columns = StatusEvent.__table__.c
+    base = select(StatusEvent.__table__).order_by(columns.id).limit(batch_size)
+    if entity_type:
+        base = base.where(columns.entity_type == entity_type)
+
+    remaining = limit
+    with engine.connect() as conn:
+        for rows in _event_pages(conn, base, after_id, month_from, month_to, batch_size):
+            for row in rows:
+                created_at = row["created_at"]
+                yield json.dumps(
+                    {
+                        "id": row["id"],
+                        "entity_type": row["entity_type"],
+                        "entity_id": row["entity_id"],
+                        "project_id": row["project_id"],
+                        "from_status": row["from_status"],
+                        "to_status": row["to_status"],
+                        "amount": row["amount"],
+                        "actor_user_id": row["actor_user_id"],
+                        "created_at": created_at.isoformat() if created_at else None,
+                    },
+                    ensure_ascii=False,
+                ) + "\n"
+                if remaining is not None:
+                    remaining -= 1
+                    if remaining == 0:
+                        return
@@ -4,6 +4,9 @@ import secrets
 
 from ..core.config import settings
 
+DEPOSIT_PERCENT = 5
+MIN_DEPOSIT = 10_000_000
+
 
 def create_authority() -> str:
     return f"AUTH-{secrets.token_hex(8).upper()}"
@@ -15,3 +18,7 @@ def create_reference_id() -> str:
 
 def build_mock_gateway_url(authority: str) -> str:
     return f"{settings.backend_public_url}/api/v1/payments/mock-gateway/{authority}"
+
+
+def calculate_deposit(price: int) -> int:
+    return max(price * DEPOSIT_PERCENT // 100, MIN_DEPOSIT)
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import difflib
+import re
+import unicodedata
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from ..db import SessionLocal
+from ..models import Project
+
+MAX_QUERY_TOKENS = 8
+MAX_FUZZY_EXPANSIONS = 3
+FUZZY_CUTOFF = 0.7
+
+_DIACRITICS = re.compile("[\u064b-\u065f\u0670\u06d6-\u06ed]")
+_TOKEN = re.compile(r"\w+")
+_CHAR_MAP = str.maketrans(
+    {
+        "ي": "ی",  # Arabic yeh -> Persian yeh
+        "ى": "ی",  # alef maksura -> Persian yeh
+        "ئ": "ی",  # yeh with hamza -> Persian yeh
+        "ك": "ک",  # Arabic kaf -> Persian kaf
+        "ة": "ه",  # teh marbuta -> heh
+        "ۀ": "ه",  # heh with yeh above -> heh
+        "أ": "ا",  # alef variants -> bare alef
+        "إ": "ا",
+        "آ": "ا",
+        "ٱ": "ا",
+        "ؤ": "و",  # waw with hamza -> waw
+        "\u200c": " ",  # ZWNJ splits compound words into separate tokens
+        "\u200d": "",
+        "\u0640": "",  # tatweel
+        **{chr(0x06F0 + digit): str(digit) for digit in range(10)},  # Persian digits
+        **{chr(0x0660 + digit): str(digit) for digit in range(10)},  # Arabic-Indic digits
+    }
+)
+
+
+def normalize_persian(value: str) -> str:
+    """
+    Folds the spelling variants users type interchangeably (Arabic yeh/kaf,
+    alef forms, ZWNJ, tatweel, diacritics, Persian digits) so that index and
+    query text compare equal.
+    """
+    value = unicodedata.normalize("NFKC", value)
+    value = _DIACRITICS.sub("", value).translate(_CHAR_MAP)
+    return value.lower()
+
+
+def tokenize(value: str) -> list[str]:
+    return _TOKEN.findall(normalize_persian(value))
+
+
+def _index_text(value: str | None) -> str:
+    return " ".join(tokenize(value or ""))
+
+
+class _SqliteSearchBackend:
+    def ensure(self, conn: Connection) -> None:
+        conn.execute(
+            text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS project_search "
+                "USING fts5(title, description, address, tokenize='unicode61')"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS project_search_vocab "
+                "USING fts5vocab(project_search, 'row')"
+            )
+        )
+
+    def clear(self, conn: Connection) -> None:
+        conn.execute(text("DELETE FROM project_search"))
+
+    def delete(self, conn: Connection, project_id: int) -> None:
+        conn.execute(text("DELETE FROM project_search WHERE rowid = :id"), {"id": project_id})
+
+    def upsert(self, conn: Connection, project_id: int, title: str, description: str, address: str) -> None:
+        self.delete(conn, project_id)
+        conn.execute(
+            text(
+                "INSERT INTO project_search (rowid, title, description, address) "
+                "VALUES (:id, :title, :description, :address)"
+            ),
+            {"id": project_id, "title": title, "description": description, "address": address},
+        )
+
+    def vocabulary(self, conn: Connection, first_char: str) -> list[str]:
+        rows = conn.execute(
+            text("SELECT term FROM project_search_vocab WHERE term >= :low AND term < :high"),
+            {"low": first_char, "high": chr(ord(first_char) + 1)},
+        )
+        return [row[0] for row in rows]
+
+    def search(
+        self, conn: Connection, groups: list[list[str]], limit: int, offset: int
+    ) -> tuple[int, list[tuple[int, float]]]:
+        match = " AND ".join("(" + " OR ".join(f'"{term}"*' for term in group) + ")" for group in groups)
+        total = conn.execute(
+            text("SELECT count(*) FROM project_search WHERE project_search MATCH :match"), {"match": match}
+        ).scalar_one()
+        rows = conn.execute(
+            text(
+                "SELECT rowid, -bm25(project_search, 10.0, 1.0, 4.0) AS rank FROM project_search "
+                "WHERE project_search MATCH :match ORDER BY rank DESC, rowid DESC LIMIT :limit OFFSET :offset"
+            ),
+            {"match": match, "limit": limit, "offset": offset},
+        )
+        return total, [(row[0], float(row[1])) for row in rows]
+
+
+class _PostgresSearchBackend:
+    _document = (
+        "setweight(to_tsvector('simple', :title), 'A') || "
+        "setweight(to_tsvector('simple', :address), 'B') || "
+        "setweight(to_tsvector('simple', :description), 'C')"
+    )
+
+    def ensure(self, conn: Connection) -> None:
+        conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS project_search ("
+                "project_id INTEGER PRIMARY KEY REFERENCES projects(id) ON DELETE CASCADE, "
+                "document TSVECTOR NOT NULL)"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_project_search_document "
+                "ON project_search USING GIN (document)"
+            )
+        )
+        # Indexed vocabulary for fuzzy expansion; ts_stat() would re-read
+        # every document per query token. The "C" collation keeps the
+        # primary key in code-point order so prefix ranges are index seeks.
+        conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS project_search_terms ("
+                'term TEXT COLLATE "C" NOT NULL, '
+                "project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE, "
+                "PRIMARY KEY (term, project_id))"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_project_search_terms_project "
+                "ON project_search_terms (project_id)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO project_search_terms (term, project_id) "
+                "SELECT lexeme, project_id FROM project_search, unnest(document) "
+                "WHERE NOT EXISTS (SELECT 1 FROM project_search_terms)"
+            )
+        )
+
+    def clear(self, conn: Connection) -> None:
+        conn.execute(text("DELETE FROM project_search_terms"))
+        conn.execute(text("DELETE FROM project_search"))
+
+    def delete(self, conn: Connection, project_id: int) -> None:
+        conn.execute(text("DELETE FROM project_search_terms WHERE project_id = :id"), {"id": project_id})
+        conn.execute(text("DELETE FROM project_search WHERE project_id = :id"), {"id": project_id})
+
+    def upsert(self, conn: Connection, project_id: int, title: str, description: str, address: str) -> None:
+        conn.execute(
+            text(
+                f"INSERT INTO project_search (project_id, document) VALUES (:id, {self._document}) "
+                "ON CONFLICT (project_id) DO UPDATE SET document = EXCLUDED.document"
+            ),
+            {"id": project_id, "title": title, "description": description, "address": address},
+        )
+        conn.execute(text("DELETE FROM project_search_terms WHERE project_id = :id"), {"id": project_id})
+        conn.execute(
+            text(
+                "INSERT INTO project_search_terms (term, project_id) "
+                "SELECT lexeme, project_id FROM project_search, unnest(document) WHERE project_id = :id"
+            ),
+            {"id": project_id},
+        )
+
+    def vocabulary(self, conn: Connection, first_char: str) -> list[str]:
+        rows = conn.execute(
+            text("SELECT DISTINCT term FROM project_search_terms WHERE term >= :low AND term < :high"),
+            {"low": first_char, "high": chr(ord(first_char) + 1)},
+        )
+        return [row[0] for row in rows]
+
+    def search(
+        self, conn: Connection, groups: list[list[str]], limit: int, offset: int
+    ) -> tuple[int, list[tuple[int, float]]]:
+        query = " & ".join("(" + " | ".join(f"{term}:*" for term in group) + ")" for group in groups)
+        total = conn.execute(
+            text("SELECT count(*) FROM project_search WHERE document @@ to_tsquery('simple', :query)"),
+            {"query": query},
+        ).scalar_one()
+        rows = conn.execute(
+            text(
+                "SELECT project_id, ts_rank(document, to_tsquery('simple', :query)) AS rank "
+                "FROM project_search WHERE document @@ to_tsquery('simple', :query) "
+                "ORDER BY rank DESC, project_id DESC LIMIT :limit OFFSET :offset"
+            ),
+            {"query": query, "limit": limit, "offset": offset},
+        )
+        return total, [(row[0], float(row[1])) for row in rows]
+
+
+_BACKENDS = {"sqlite": _SqliteSearchBackend(), "postgresql": _PostgresSearchBackend()}
+
+
+def _backend(conn: Connection):
+    try:
+        return _BACKENDS[conn.dialect.name]
+    except KeyError as exc:
+        raise RuntimeError(f"Project search is not supported on {conn.dialect.name}") from exc
+
+
+def ensure_search_index(bind: Engine, backfill: bool = True) -> int:
+    """
+    Creates the index tables and, on a database whose projects predate the
+    index, indexes them once; the flush hook only sees later writes.
+    Returns the number of projects indexed by this call.
+    """
+    with bind.begin() as conn:
+        _backend(conn).ensure(conn)
+        if not backfill or conn.execute(text("SELECT 1 FROM project_search LIMIT 1")).first() is not None:
+            return 0
+    with Session(bind) as db:
+        if db.query(Project.id).first() is None:
+            return 0
+        count = reindex_projects(db)
+        db.commit()
+    return count
+
+
+def index_project(conn: Connection, project: Project) -> None:
+    _backend(conn).upsert(
+        conn,
+        project.id,
+        _index_text(project.title),
+        _index_text(project.description),
+        _index_text(project.address),
+    )
+
+
+def reindex_projects(db: Session) -> int:
+    conn = db.connection()
+    _backend(conn).clear(conn)
+    count = 0
+    for project in db.query(Project).yield_per(500):
+        index_project(conn, project)
+        count += 1
+    return count
+
+
+def _expand_term(conn: Connection, term: str) -> list[str]:
+    """
+    Returns prefix terms to match for one query token. Exact prefixes win;
+    otherwise the closest indexed words (compared on a prefix of the same
+    length) are used so a typo in a partially typed word still matches.
+    """
+    vocabulary = _backend(conn).vocabulary(conn, term[0])
+    if any(word.startswith(term) for word in vocabulary):
+        return [term]
+    prefixes = {word[: len(term)] for word in vocabulary if len(word) >= len(term) - 1}
+    close = difflib.get_close_matches(term, prefixes, n=MAX_FUZZY_EXPANSIONS, cutoff=FUZZY_CUTOFF)
+    return close or [term]
+
+
+def search_projects(
+    db: Session, query: str, limit: int, offset: int
+) -> tuple[int, list[tuple[int, float]]]:
+    """Returns the total number of matches and one page of ``(project_id, rank)`` pairs."""
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TOKENS]
+    if not terms:
+        return 0, []
+    conn = db.connection()
+    groups = [_expand_term(conn, term) for term in terms]
+    return _backend(conn).search(conn, groups, limit, offset)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _sync_project_search(session: Session, _flush_context) -> None:
+    conn = session.connection()
+    for obj in session.deleted:
+        if isinstance(obj, Project):
+            _backend(conn).delete(conn, obj.id)
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Project):
+            continue
+        state = inspect(obj)
+        if obj in session.new or any(
+            state.attrs[name].history.has_changes() for name in ("title", "description", "address")
+        ):
+            index_project(conn, obj)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import secrets
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.revocation import revocation_filter
+from ..core.security import create_access_token, create_refresh_token, hash_refresh_token
+from ..models import RefreshToken, RevokedToken, User
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _store_refresh_token(db: Session, user_id: int, family_id: str) -> str:
+    token = create_refresh_token()
+    db.add(
+        RefreshToken(
+            user_id=user_id,
+            family_id=family_id,
+            token_hash=hash_refresh_token(token),
+            expires_at=datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days),
+        )
+    )
+    return token
+
+
+def issue_tokens(db: Session, user: User) -> tuple[str, str]:
+    """Starts a new refresh-token family for a fresh login and returns ``(access, refresh)``."""
+    refresh_token = _store_refresh_token(db, user.id, secrets.token_hex(16))
+    db.commit()
+    return create_access_token(str(user.id)), refresh_token
+
+
+def rotate_refresh_token(db: Session, token: str) -> tuple[User, str, str]:
+    """
+    Exchanges a refresh token for a new pair. Each refresh token is single
+    use: presenting one that was already rotated revokes its whole family,
+    since that means either the client or an attacker holds a stale copy.
+    """
+    row = db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(token)).first()
+    if not row:
+        raise ValueError("Unknown refresh token")
+
+    now = datetime.now(timezone.utc)
+    claimed = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == row.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+    if claimed.rowcount == 0:
+        revoke_refresh_family(db, row.family_id)
+        db.commit()
+        raise ValueError("Refresh token reuse detected")
+    if _aware(row.expires_at) <= now:
+        db.commit()
+        raise ValueError("Refresh token expired")
+
+    user = db.query(User).filter(User.id == row.user_id).first()
+    if not user:
+        db.commit()
+        raise ValueError("Unknown user")
+    refresh_token = _store_refresh_token(db, user.id, row.family_id)
+    db.commit()
+    return user, create_access_token(str(user.id)), refresh_token
+
+
+def revoke_refresh_family(db: Session, family_id: str) -> None:
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+
+def revoke_access_token(db: Session, jti: str, expires_at: datetime) -> None:
+    if not db.query(RevokedToken.jti).filter(RevokedToken.jti == jti).first():
+        db.add(RevokedToken(jti=jti, expires_at=expires_at))
+    revocation_filter.add(jti, expires_at)
+
+
+def is_access_token_revoked(db: Session, jti: str) -> bool:
+    """Cheap in-memory check first; the database is only consulted on a filter hit."""
+    if not revocation_filter.might_be_revoked(jti):
+        return False
+    return db.query(RevokedToken.jti).filter(RevokedToken.jti == jti).first() is not None
+
+
+def purge_expired_tokens(db: Session) -> int:
+    now = datetime.now(timezone.utc)
+    removed = db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
+    removed += db.query(RefreshToken).filter(RefreshToken.expires_at <= now).delete(synchronize_session=False)
+    return removed
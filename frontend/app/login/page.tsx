@@ -26,7 +26,7 @@ export default function LoginPage() {
           mobile: String(formData.get("mobile") || ""),
           password: String(formData.get("password") || "")
         });
-        setSession(response.access_token, response.user);
+        setSession(response);
         router.push("/dashboard");
       } else {
         const response = await registerUser({
@@ -35,7 +35,7 @@ export default function LoginPage() {
           password: String(formData.get("password") || ""),
           email: String(formData.get("email") || "") || undefined
         });
-        setSession(response.access_token, response.user);
+        setSession(response);
         setMessage("حساب شما با موفقیت ساخته شد. در حال انتقال به داشبورد...");
         setTimeout(() => router.push("/dashboard"), 300);
       }
@@ -3,24 +3,65 @@
 import { createContext, useContext, useEffect, useMemo, useState } from "react";
 import type { ReactNode } from "react";
 
-import { getMe } from "../lib/api";
-import type { User } from "../lib/types";
+import { getMe, logoutSession, refreshSession, setTokenRefresher } from "../lib/api";
+import type { AuthSession, User } from "../lib/types";
 
 type AuthContextShape = {
   token: string | null;
   user: User | null;
   loading: boolean;
-  setSession: (accessToken: string, user: User) => void;
+  setSession: (session: AuthSession) => void;
   logout: () => void;
 };
 
 const AuthContext = createContext<AuthContextShape | null>(null);
 
+function storeSession(session: AuthSession) {
+  window.localStorage.setItem("onepay_token", session.access_token);
+  window.localStorage.setItem("onepay_refresh_token", session.refresh_token);
+  window.localStorage.setItem("onepay_user", JSON.stringify(session.user));
+}
+
+function clearStoredSession() {
+  window.localStorage.removeItem("onepay_token");
+  window.localStorage.removeItem("onepay_refresh_token");
+  window.localStorage.removeItem("onepay_user");
+}
+
 export function AuthProvider({ children }: { children: ReactNode }) {
   const [token, setToken] = useState<string | null>(null);
   const [user, setUser] = useState<User | null>(null);
   const [loading, setLoading] = useState(true);
 
+  useEffect(() => {
+    // Refresh tokens rotate on use and reusing one revokes the whole session,
+    // so concurrent 401s must share a single in-flight refresh.
+    let pending: Promise<string | null> | null = null;
+    setTokenRefresher(() => {
+      if (!pending) {
+        const refreshToken = window.localStorage.getItem("onepay_refresh_token");
+        pending = (refreshToken ? refreshSession(refreshToken) : Promise.reject(new Error("No session")))
+          .then((session) => {
+            storeSession(session);
+            setToken(session.access_token);
+            setUser(session.user);
+            return session.access_token;
+          })
+          .catch(() => {
+            clearStoredSession();
+            setToken(null);
+            setUser(null);
+            return null;
+          })
+          .finally(() => {
+            pending = null;
+          });
+      }
+      return pending;
+    });
+    return () => setTokenRefresher(null);
+  }, []);
+
   useEffect(() => {
     const storedToken = window.localStorage.getItem("onepay_token");
     const storedUser = window.localStorage.getItem("onepay_user");
@@ -38,8 +79,7 @@ export function AuthProvider({ children }: { children: ReactNode }) {
         window.localStorage.setItem("onepay_user", JSON.stringify(profile));
       })
       .catch(() => {
-        window.localStorage.removeItem("onepay_token");
-        window.localStorage.removeItem("onepay_user");
+        clearStoredSession();
         setToken(null);
         setUser(null);
       })
@@ -53,17 +93,20 @@ export function AuthProvider({ children }: { children: ReactNode }) {
       token,
       user,
       loading,
-      setSession: (accessToken, currentUser) => {
-        setToken(accessToken);
-        setUser(currentUser);
-        window.localStorage.setItem("onepay_token", accessToken);
-        window.localStorage.setItem("onepay_user", JSON.stringify(currentUser));
+      setSession: (session) => {
+        setToken(session.access_token);
+        setUser(session.user);
+        storeSession(session);
       },
       logout: () => {
+        const refreshToken = window.localStorage.getItem("onepay_refresh_token");
+        if (token || refreshToken) {
+          // Best effort: the local session is cleared even if the API is unreachable.
+          logoutSession(token, refreshToken).catch(() => undefined);
+        }
         setToken(null);
         setUser(null);
-        window.localStorage.removeItem("onepay_token");
-        window.localStorage.removeItem("onepay_user");
+        clearStoredSession();
       }
     }),
     [token, user, loading]
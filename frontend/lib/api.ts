@@ -1,4 +1,5 @@
 import type {
+  AuthSession,
   PaymentInitResponse,
   ProjectDetail,
   ProjectListItem,
@@ -29,7 +30,20 @@ const requestStatusMap: Record<string, string> = {
   cancelled: "لغو شده"
 };
 
-async function apiFetch<T>(path: string, options: RequestInit = {}, token?: string): Promise<T> {
+// Set by AuthProvider: exchanges the stored refresh token for a new access
+// token, or resolves to null when the session cannot be renewed.
+let tokenRefresher: (() => Promise<string | null>) | null = null;
+
+export function setTokenRefresher(refresher: (() => Promise<string | null>) | null): void {
+  tokenRefresher = refresher;
+}
+
+async function apiFetch<T>(
+  path: string,
+  options: RequestInit = {},
+  token?: string,
+  retryOnExpiry = true
+): Promise<T> {
   const headers = new Headers(options.headers);
   if (!headers.has("Content-Type")) {
     headers.set("Content-Type", "application/json");
@@ -44,10 +58,19 @@ async function apiFetch<T>(path: string, options: RequestInit = {}, token?: stri
     cache: "no-store"
   });
 
+  if (response.status === 401 && token && retryOnExpiry && tokenRefresher) {
+    const freshToken = await tokenRefresher();
+    if (freshToken) {
+      return apiFetch(path, options, freshToken, false);
+    }
+  }
   if (!response.ok) {
     const text = await response.text();
     throw new Error(text || `HTTP ${response.status}`);
   }
+  if (response.status === 204) {
+    return undefined as T;
+  }
   return response.json() as Promise<T>;
 }
 
@@ -56,7 +79,7 @@ export async function registerUser(payload: {
   mobile: string;
   password: string;
   email?: string;
-}): Promise<{ access_token: string; user: User }> {
+}): Promise<AuthSession> {
   return apiFetch("/auth/register", {
     method: "POST",
     body: JSON.stringify(payload)
@@ -66,13 +89,31 @@ export async function registerUser(payload: {
 export async function loginUser(payload: {
   mobile: string;
   password: string;
-}): Promise<{ access_token: string; user: User }> {
+}): Promise<AuthSession> {
   return apiFetch("/auth/login", {
     method: "POST",
     body: JSON.stringify(payload)
   });
 }
 
+export async function refreshSession(refreshToken: string): Promise<AuthSession> {
+  return apiFetch("/auth/refresh", {
+    method: "POST",
+    body: JSON.stringify({ refresh_token: refreshToken })
+  });
+}
+
+// The refresh token alone is enough for the API to end the session, so this
+// also works once the access token has expired; the bearer is sent when held.
+export async function logoutSession(token: string | null, refreshToken: string | null): Promise<void> {
+  return apiFetch(
+    "/auth/logout",
+    { method: "POST", body: JSON.stringify({ refresh_token: refreshToken }) },
+    token || undefined,
+    false
+  );
+}
+
 export async function getMe(token: string): Promise<User> {
   return apiFetch("/auth/me", {}, token);
 }
@@ -6,6 +6,13 @@ export type User = {
   created_at: string;
 };
 
+export type AuthSession = {
+  access_token: string;
+  refresh_token: string;
+  expires_in: number;
+  user: User;
+};
+
 export type Unit = {
   id: number;
   project_id: number;